@@ -1,13 +1,139 @@
+import json
+import os
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from columnar_store import ColumnarStore
 
 pd.set_option('expand_frame_repr', False)
-file = 'vacancies_by_year.csv'
-df = pd.read_csv(file)
-df['years'] = df['published_at'].apply(lambda s: datetime.strptime(s, "%Y-%m-%dT%H:%M:%S%z").year)
-years = df['years'].unique()
-
-for year in years:
-    data = df[df['years'] == year]
-    data.iloc[:, :6].to_csv(f"csv_files\\part_{year}.csv", index=False)
-    # data[['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']].to_csv(rf"csv_files\part_{year}.csv", index=False)
\ No newline at end of file
+
+partitions = ('year', 'month', 'area', 'rows')
+
+
+def get_keys(chunk, years, partition, offset, shards, shard_rows):
+    """Возвращает ключ части для каждой строки куска файла
+
+        Args:
+            chunk (DataFrame): Кусок файла
+            years (Series): Годы публикации строк куска
+            partition (str): Способ разбиения: 'year', 'month', 'area' или 'rows'
+            offset (int): Номер первой строки куска в файле
+            shards (int): Количество частей для разбиения по региону
+            shard_rows (int): Количество строк в части для разбиения по строкам
+
+        Returns:
+            Series: Ключи частей, они же окончания названий файлов part_{key}.csv
+    """
+    if partition == 'year':
+        return years
+    if partition == 'month':
+        return chunk['published_at'].str[:7]
+    if partition == 'area':
+        numbers = pd.util.hash_pandas_object(chunk['area_name'], index=False).to_numpy() % np.uint64(shards)
+        return pd.Series(numbers, index=chunk.index).map(lambda number: f'area_{number:02d}')
+    numbers = (offset + np.arange(len(chunk))) // shard_rows
+    return pd.Series(numbers, index=chunk.index).map(lambda number: f'{number:05d}')
+
+
+def split_csv(file_name, directory='csv_files', partition='year', columns=None, chunk_size=100_000, shards=16,
+              shard_rows=100_000, file_format='csv'):
+    """Разбивает csv файл на файлы part_{key}.csv за один проход и записывает в папку manifest.json.
+    Файл читается частями по chunk_size строк, поэтому память не зависит от размера файла, а строки каждого куска
+    дописываются в файлы своих частей одной группировкой. Значения переносятся без изменений, как строки,
+    строки без даты пропускаются. Способы разбиения:
+        'year' - по году публикации (part_2022.csv);
+        'month' - по году и месяцу публикации (part_2022-07.csv);
+        'area' - по хэшу названия региона на shards частей (part_area_03.csv);
+        'rows' - на части по shard_rows строк в порядке файла (part_00003.csv).
+    Для каждой части в manifest.json записываются количество строк, размер в байтах, первый и последний год
+    и встречающиеся валюты, чтобы обработчики могли распределять части и пропускать ненужные.
+    В форматах 'parquet' и 'feather' (Arrow IPC) части part_{key}.parquet и part_{key}.feather записываются
+    очищенными и типизированными (ColumnarStore), а строки с пустыми ячейками в них не попадают
+
+        Args:
+            file_name (str): Название исходного csv файла
+            directory (str): Папка для файлов частей
+            partition (str): Способ разбиения
+            columns (list or None): Сохраняемые колонки, None - все колонки файла
+            chunk_size (int): Количество строк, читаемых за один раз
+            shards (int): Количество частей для разбиения по региону
+            shard_rows (int): Количество строк в части для разбиения по строкам
+            file_format (str): Формат частей: 'csv', 'parquet' или 'feather'
+
+        Returns:
+            dict: Содержимое manifest.json
+    """
+    if partition not in partitions:
+        raise ValueError(f'Неизвестный способ разбиения: {partition}')
+    if file_format != 'csv' and file_format not in ColumnarStore.formats:
+        raise ValueError(f'Неизвестный формат частей: {file_format}')
+    extension = ColumnarStore.formats.get(file_format, '.csv')
+    usecols = None
+    if columns is not None:
+        heads = pd.read_csv(file_name, nrows=0, encoding='utf-8-sig').columns
+        usecols = list(columns) + [name for name in ('published_at', 'area_name', 'salary_currency')
+                                   if name in heads and name not in columns]
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    shard_list = {}
+    offset = 0
+    try:
+        for chunk in pd.read_csv(file_name, chunksize=chunk_size, usecols=usecols, dtype=str,
+                                 keep_default_na=False, encoding='utf-8-sig'):
+            years = chunk['published_at'].str[:4]
+            valid = years.str.isdigit()
+            if file_format != 'csv':
+                kept = chunk if columns is None else chunk[list(columns)]
+                valid &= (kept.notna() & (kept != '')).all(axis=1)
+            chunk, years = chunk[valid], years[valid]
+            keys = get_keys(chunk, years, partition, offset, shards, shard_rows)
+            offset += len(chunk)
+            currencies = chunk['salary_currency'] if 'salary_currency' in chunk else None
+            if columns is not None:
+                chunk = chunk[list(columns)]
+            if file_format != 'csv':
+                chunk = ColumnarStore.prepare(chunk, years)
+            for key, data in chunk.groupby(keys, sort=False):
+                shard = shard_list.get(key)
+                if shard is None:
+                    name = f'part_{key}{extension}'
+                    path = os.path.join(directory, name)
+                    if file_format == 'csv':
+                        files[key] = open(path, 'w', encoding='utf-8', newline='')
+                    else:
+                        files[key] = ColumnarStore.get_writer(path, file_format, data)
+                    shard = shard_list[key] = {'file': name, 'key': key, 'rows': 0, 'bytes': 0,
+                                               'years': [None, None], 'currencies': set()}
+                if file_format == 'csv':
+                    data.to_csv(files[key], index=False, header=shard['rows'] == 0, lineterminator='\n')
+                else:
+                    files[key].write(data)
+                shard['rows'] += len(data)
+                data_years = years[data.index]
+                first, last = data_years.min(), data_years.max()
+                shard['years'] = [first if shard['years'][0] is None else min(shard['years'][0], first),
+                                  last if shard['years'][1] is None else max(shard['years'][1], last)]
+                if currencies is not None:
+                    shard['currencies'].update(currencies[data.index].unique())
+            if partition == 'rows' and len(keys):
+                for key in [key for key in files if key != keys.iloc[-1]]:
+                    files.pop(key).close()
+    finally:
+        for file in files.values():
+            file.close()
+
+    shard_list = [shard_list[key] for key in sorted(shard_list)]
+    for shard in shard_list:
+        shard['bytes'] = os.path.getsize(os.path.join(directory, shard['file']))
+        shard['years'] = [int(year) for year in shard['years']]
+        shard['currencies'] = sorted(currency for currency in shard['currencies'] if currency != '')
+    manifest = {'source': os.path.basename(file_name), 'partition': partition, 'format': file_format,
+                'rows': sum(shard['rows'] for shard in shard_list), 'shards': shard_list}
+    temp_name = os.path.join(directory, 'manifest.json.tmp')
+    with open(temp_name, 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=4)
+    os.replace(temp_name, os.path.join(directory, 'manifest.json'))
+    return manifest
+
+
+if __name__ == '__main__':
+    split_csv('vacancies_by_year.csv', 'csv_files')
@@ -1,6 +1,43 @@
+import importlib.util
+import io
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
 from unittest import TestCase
+import numpy as np
+import pandas as pd
 import report_out
 import table_out
+from columnar_store import ColumnarStore
+from currency_rates import CurrencyRates
+from dataset_cache import DatasetCache
+from mmap_reader import MappedCsv
+from profession_index import ProfessionMatcher
+from table_index import IntervalTree, TableIndex
+
+
+def write_vacancies(directory, text):
+    """Записывает text в файл vacancies.csv в папке directory и возвращает путь к файлу"""
+    file_name = os.path.join(directory, 'vacancies.csv')
+    with open(file_name, 'w', encoding='utf-8-sig') as file:
+        file.write(text)
+    return file_name
+
+
+@contextmanager
+def vacancies_file(text):
+    """Создает временную папку с файлом vacancies.csv и возвращает путь к файлу, папка удаляется после блока with"""
+    with tempfile.TemporaryDirectory() as directory:
+        yield write_vacancies(directory, text)
+
+
+def temp_directory(test_case):
+    """Создает временную папку, которая удаляется после теста test_case, и возвращает путь к ней"""
+    directory = tempfile.TemporaryDirectory()
+    test_case.addCleanup(directory.cleanup)
+    return directory.name
 
 
 class PrepareTests_for_report_Out(TestCase):
@@ -68,6 +105,27 @@ class as_textTests_for_report_out(TestCase):
         self.assertEqual(report_out.Report.as_text('string'), 'string')
 
 
+class get_directoryTests_for_report_out(TestCase):
+    def test_unique(self):
+        keys = ['Программист C++', 'Программист C#', 'Программист C', 'Python', 'python']
+        directories = [report_out.Report.get_directory(key).casefold() for key in keys]
+        self.assertEqual(len(set(directories)), len(keys))
+
+    def test_stable(self):
+        self.assertEqual(report_out.Report.get_directory('Python'), report_out.Report.get_directory('Python'))
+
+
+class PrepareTests_for_table_out(TestCase):
+    def test_Tags(self):
+        self.assertEqual(table_out.Tools.prepare('<p>Python  <b>developer</b></p>'), 'Python developer')
+
+    def test_Multiline(self):
+        self.assertEqual(table_out.Tools.prepare('Git\nLinux'), 'Git\nLinux')
+
+    def test_Bool(self):
+        self.assertEqual(table_out.Tools.prepare('False'), 'Нет')
+
+
 class SalaryTests_for_table_out(TestCase):
     def test_salary_type(self):
         self.assertEqual(type(table_out.Salary(10.0, 20.4, 'Нет', 'RUR')).__name__, 'Salary')
@@ -79,4 +137,478 @@ class SalaryTests_for_table_out(TestCase):
         self.assertEqual(table_out.Salary(10.0, 20.4, 'Нет', 'RUR').salary_to, 20)
 
     def test_salary_currency(self):
-        self.assertEqual(table_out.Salary('10.0', 20.4, 'Нет', 'RUR').salary_currency, 'RUR')
\ No newline at end of file
+        self.assertEqual(table_out.Salary('10.0', 20.4, 'Нет', 'RUR').salary_currency, 'RUR')
+
+
+class StatsAccumulatorTests_for_report_out(TestCase):
+    @staticmethod
+    def vacancies():
+        return [report_out.Vacancy('Программист', report_out.Salary(10, 30, 'RUR'), 'Москва', '2020-01-01T10:00:00+0300'),
+                report_out.Vacancy('Аналитик', report_out.Salary(10, 20, 'EUR'), 'Казань', '2020-05-01T10:00:00+0300'),
+                report_out.Vacancy('Программист', report_out.Salary(40, 60, 'RUR'), 'Москва', '2022-01-01T10:00:00+0300')]
+
+    def test_years(self):
+        report = report_out.StatsAccumulator('Программист').add_all(self.vacancies()).get_report()
+        self.assertEqual(report.vac_filter, {2020: 2, 2021: 0, 2022: 1})
+        self.assertEqual(report.vac_sal_filter, {2020: 20, 2021: 0, 2022: 50})
+
+    def test_cities(self):
+        report = report_out.StatsAccumulator('Программист').add_all(self.vacancies()).get_report()
+        self.assertEqual(report.salary_cities_filter, {'Казань': 898, 'Москва': 35})
+
+    def test_merge(self):
+        vacancies = self.vacancies()
+        whole = report_out.StatsAccumulator('Программист').add_all(vacancies)
+        merged = report_out.StatsAccumulator('Программист').add_all(vacancies[:1])
+        merged.merge(report_out.StatsAccumulator('Программист').add_all(vacancies[1:]))
+        self.assertEqual(merged.get_report().__dict__, whole.get_report().__dict__)
+        self.assertEqual(merged.total, whole.total)
+
+    def test_ties_order(self):
+        vacancies = [report_out.Vacancy('Программист', report_out.Salary(10, 30, 'RUR'), 'Уфа', '2022-01-01T10:00:00+0300'),
+                     report_out.Vacancy('Аналитик', report_out.Salary(10, 30, 'RUR'), 'Казань', '2020-05-01T10:00:00+0300'),
+                     report_out.Vacancy('Программист', report_out.Salary(40, 60, 'RUR'), 'Сочи', '2022-01-01T10:00:00+0300'),
+                     report_out.Vacancy('Аналитик', report_out.Salary(40, 60, 'RUR'), 'Омск', '2020-05-01T10:00:00+0300')]
+        whole = report_out.StatsAccumulator('Программист').add_all(vacancies).get_report()
+        merged = report_out.StatsAccumulator('Программист').add_all(vacancies[1::2])
+        merged = merged.merge(report_out.StatsAccumulator('Программист').add_all(vacancies[::2])).get_report()
+        for report in (whole, merged):
+            self.assertEqual(list(report.vacs_cities.items()),
+                             [('Казань', 0.25), ('Омск', 0.25), ('Сочи', 0.25), ('Уфа', 0.25)])
+            self.assertEqual(list(report.salary_cities_filter.items()),
+                             [('Омск', 50), ('Сочи', 50), ('Казань', 20), ('Уфа', 20)])
+
+    def test_save_load(self):
+        vacancies = self.vacancies()
+        whole = report_out.StatsAccumulator('Программист').add_all(vacancies)
+        with tempfile.TemporaryDirectory() as directory:
+            state_file = os.path.join(directory, 'state.json')
+            report_out.StatsAccumulator('Программист').add_all(vacancies[:2]).save(state_file)
+            loaded = report_out.StatsAccumulator.load(state_file).add_all(vacancies[2:])
+        self.assertEqual(loaded.get_report().__dict__, whole.get_report().__dict__)
+        self.assertEqual(loaded.key_cities, {'Москва': [[70.0], 2]})
+
+    def test_update_twice(self):
+        with vacancies_file('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                            'Программист,10,30,RUR,Москва,2020-01-01T10:00:00+0300\n'
+                            'Аналитик,10,20,EUR,Казань,2020-05-01T10:00:00+0300\n') as file_name:
+            state_file = os.path.join(os.path.dirname(file_name), 'state.json')
+            first = report_out.StatsAccumulator.update(state_file, file_name, 'Программист').get_report()
+            with redirect_stdout(io.StringIO()) as output:
+                second = report_out.StatsAccumulator.update(state_file, file_name, 'Программист')
+            self.assertEqual(output.getvalue(), 'Файл уже добавлен в статистику\n')
+            self.assertEqual(second.total, 2)
+            self.assertEqual(second.get_report().__dict__, first.__dict__)
+            self.assertEqual(report_out.StatsAccumulator.load(state_file).batches,
+                             [report_out.StatsAccumulator.get_fingerprint(file_name)])
+
+    def test_batch(self):
+        vacancies = self.vacancies()
+        keys = ['Программист', 'Аналитик', 'Водитель']
+        batch = report_out.BatchStatsAccumulator(keys).add_all(vacancies)
+        for key in keys:
+            single = report_out.StatsAccumulator(key).add_all(vacancies)
+            self.assertEqual(batch.get_stats(key).get_report().__dict__, single.get_report().__dict__)
+
+    def test_exact_sum(self):
+        partials = []
+        for value in [0.1] * 10:
+            report_out.StatsAccumulator.add_exact(partials, value)
+        self.assertEqual(report_out.math.fsum(partials), 1.0)
+
+    def test_chunks_manifest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'part_b.csv'), 'w', encoding='utf-8') as file:
+                file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                           'Программист,40,60,RUR,Москва,2022-01-01T10:00:00+0300\n')
+            with open(os.path.join(directory, 'part_a.csv'), 'w', encoding='utf-8') as file:
+                file.write('name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                           'Программист,10,30,RUR,Москва,2020-01-01T10:00:00+0300\n'
+                           'Аналитик,10,20,EUR,Казань,2020-05-01T10:00:00+0300\n')
+            with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as file:
+                file.write('{"shards": [{"file": "part_a.csv"}, {"file": "part_b.csv"}]}')
+            self.assertEqual(report_out.DataSet.get_chunk_files(directory),
+                             [os.path.join(directory, 'part_a.csv'), os.path.join(directory, 'part_b.csv')])
+            stats = report_out.StatsAccumulator.from_chunks(directory, 'Программист', 2)
+        whole = report_out.StatsAccumulator('Программист').add_all(self.vacancies())
+        self.assertEqual(stats.get_report().__dict__, whole.get_report().__dict__)
+
+
+class ChartRendererTests_for_report_out(TestCase):
+    def test_threads(self):
+        vacancies = StatsAccumulatorTests_for_report_out.vacancies()
+        reports = [report_out.StatsAccumulator(key).add_all(vacancies).get_report() for key in ('Программист', 'Аналитик')]
+
+        def render(report):
+            image = io.BytesIO()
+            report_out.ChartRenderer.get_default().render(report, image, 'png')
+            return image.getvalue()
+
+        expected = [render(report) for report in reports]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            self.assertEqual(list(executor.map(render, reports * 2)), expected * 2)
+
+
+class SplitCsvTests(TestCase):
+    rows = ['name,salary_from,salary_to,salary_currency,area_name,published_at',
+            'Программист,10,30,RUR,Москва,2020-01-01T10:00:00+0300',
+            'Аналитик,10,20,EUR,Казань,2020-05-01T10:00:00+0300',
+            'Водитель,20,40,RUR,Пермь,',
+            'Программист,40,60,USD,Москва,2022-01-01T10:00:00+0300',
+            'Менеджер,30,50,RUR,Казань,2022-05-01T10:00:00+0300']
+    expected = {'year': [('2020', 2, [2020, 2020], ['EUR', 'RUR']), ('2022', 2, [2022, 2022], ['RUR', 'USD'])],
+                'month': [('2020-01', 1, [2020, 2020], ['RUR']), ('2020-05', 1, [2020, 2020], ['EUR']),
+                          ('2022-01', 1, [2022, 2022], ['USD']), ('2022-05', 1, [2022, 2022], ['RUR'])],
+                'rows': [('00000', 3, [2020, 2022], ['EUR', 'RUR', 'USD']), ('00001', 1, [2022, 2022], ['RUR'])]}
+
+    @classmethod
+    def setUpClass(cls):
+        spec = importlib.util.spec_from_file_location(
+            'splitting_into_chunks', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Splitting into chunks.py'))
+        cls.splitter = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(cls.splitter)
+
+    def test_partitions(self):
+        with vacancies_file('\n'.join(self.rows)) as file_name:
+            directory = os.path.dirname(file_name)
+            for partition in self.splitter.partitions:
+                chunks = os.path.join(directory, partition)
+                self.splitter.split_csv(file_name, chunks, partition, chunk_size=2, shards=4, shard_rows=3)
+                with open(os.path.join(chunks, 'manifest.json'), encoding='utf-8') as file:
+                    manifest = json.load(file)
+                self.assertEqual((manifest['partition'], manifest['rows']), (partition, 4))
+                self.assertEqual(sorted(os.listdir(chunks)),
+                                 sorted([shard['file'] for shard in manifest['shards']] + ['manifest.json']))
+                for shard in manifest['shards']:
+                    self.assertEqual(shard['file'], f'part_{shard["key"]}.csv')
+                    data = pd.read_csv(os.path.join(chunks, shard['file']), dtype=str)
+                    self.assertEqual(shard['rows'], len(data))
+                    self.assertEqual(shard['years'], [int(data['published_at'].min()[:4]),
+                                                      int(data['published_at'].max()[:4])])
+                    self.assertEqual(shard['currencies'], sorted(data['salary_currency'].unique()))
+                    if partition == 'area':
+                        self.assertTrue(shard['key'].startswith('area_'))
+                if partition == 'area':
+                    areas = [pd.read_csv(os.path.join(chunks, shard['file']), dtype=str)['area_name'].unique().tolist()
+                             for shard in manifest['shards']]
+                    self.assertEqual(sorted(area for shard_areas in areas for area in shard_areas),
+                                     ['Казань', 'Москва'])
+                else:
+                    self.assertEqual([(shard['key'], shard['rows'], shard['years'], shard['currencies'])
+                                      for shard in manifest['shards']], self.expected[partition])
+
+
+class ColumnarStoreTests(TestCase):
+    rows = ['name,salary_from,salary_to,salary_gross,salary_currency,area_name,published_at',
+            '<b>Программист</b>,10.0,30,True,RUR,Москва,2020-01-01T10:00:00+0300',
+            'Аналитик,10,20.5,False,EUR,Казань,2020-05-01T23:30:00+0500',
+            'Программист,40,60,True,RUR,Москва,2022-01-01T01:00:00+0300']
+
+    def write(self, directory, file_format):
+        chunk = pd.read_csv(io.StringIO('\n'.join(self.rows)), dtype=str, keep_default_na=False)
+        data = ColumnarStore.prepare(chunk, chunk['published_at'].str[:4])
+        file_name = os.path.join(directory, 'part_0' + ColumnarStore.formats[file_format])
+        writer = ColumnarStore.get_writer(file_name, file_format, data)
+        writer.write(data.iloc[:2])
+        writer.write(data.iloc[2:])
+        writer.close()
+        return file_name
+
+    def test_same_as_csv(self):
+        with vacancies_file('\n'.join(self.rows)) as csv_name:
+            directory = os.path.dirname(csv_name)
+            expected = [(vacancy.name, vacancy.area_name, vacancy.published_at, vacancy.salary.salary_to_rub)
+                        for vacancy in report_out.DataSet(csv_name).vacancies_objects]
+            for file_format in ColumnarStore.formats:
+                file_name = self.write(directory, file_format)
+                vacancies = report_out.DataSet(file_name).vacancies_objects
+                self.assertEqual([(vacancy.name, vacancy.area_name, vacancy.published_at,
+                                   vacancy.salary.salary_to_rub) for vacancy in vacancies], expected)
+                rows = table_out.DataSet(file_name, {'salary_gross', 'area_name'}).vacancies_objects
+                self.assertEqual({(row.name, row.salary) for row in rows}, {('', None)})
+                self.assertEqual([row.area_name for row in rows], ['Москва', 'Казань', 'Москва'])
+
+    def test_columnar_dataset(self):
+        with vacancies_file('\n'.join(self.rows)) as csv_name:
+            directory = os.path.dirname(csv_name)
+            expected = report_out.ColumnarDataSet(csv_name).get_stats('Программист').get_report()
+            for file_format in ColumnarStore.formats:
+                file_name = self.write(directory, file_format)
+                columnar = report_out.ColumnarDataSet(file_name).get_stats('Программист').get_report()
+                self.assertEqual(columnar.__dict__, expected.__dict__)
+
+    def test_pushdown(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = self.write(directory, 'parquet')
+            self.assertEqual([vacancy.year for vacancy in report_out.DataSet(file_name, years=[2020]).vacancies_objects],
+                             [2020, 2020])
+            rows = table_out.DataSet(file_name, areas=['Москва'], years=[2022]).vacancies_objects
+            self.assertEqual([(row.published_at, row.salary.salary_gross) for row in rows],
+                             [('2022-01-01T01:00:00+0300', 'Да')])
+
+
+class ColumnarDataSetTests_for_report_out(TestCase):
+    rows = ['name,salary_from,salary_to,salary_currency,area_name,published_at',
+            'Программист,10,30,RUR,Москва,2020-01-01T10:00:00+0300',
+            'Аналитик,10,20,EUR,Казань,2020-05-01T10:00:00+0300',
+            'Программист,,60,RUR,Москва,2021-01-01T10:00:00+0300',
+            '<b>Программист</b>,40,60,RUR,Москва,2022-01-01T10:00:00+0300']
+
+    def setUp(self):
+        self.file_name = write_vacancies(temp_directory(self), '\n'.join(self.rows))
+
+    def test_same_as_stream(self):
+        columnar = report_out.ColumnarDataSet(self.file_name).get_stats('Программист').get_report()
+        stream = report_out.StatsAccumulator('Программист').add_all(
+            report_out.DataSet.iter_vacancies(self.file_name)).get_report()
+        self.assertEqual(columnar.__dict__, stream.__dict__)
+
+    def test_categories(self):
+        dataset = report_out.ColumnarDataSet(self.file_name)
+        self.assertEqual(dataset.areas, ['Москва', 'Казань'])
+        self.assertEqual(dataset.years.tolist(), [2020, 2020, 2022])
+
+
+class CurrencyRatesTests(TestCase):
+    def setUp(self):
+        self.directory = temp_directory(self)
+        self.file_name = os.path.join(self.directory, 'rates.csv')
+        with open(self.file_name, 'w', encoding='utf-8') as file:
+            file.write('date,USD,EUR\n2020-01,61.5,\n2020-05,73.2,80.1\n')
+
+    def tearDown(self):
+        CurrencyRates.default = None
+
+    def test_month_and_fallback(self):
+        rates = CurrencyRates(self.file_name)
+        self.assertEqual(rates.get_rate('USD', '2020-05-01T10:00:00+0300'), 73.2)
+        self.assertEqual(rates.get_rate('EUR', '2020-01-01T10:00:00+0300'), 80.1)
+        self.assertEqual(rates.get_rate('USD', '2020-03-01T10:00:00+0300'), 61.5)
+        self.assertEqual(rates.get_rate('USD', '2022-01-01T10:00:00+0300'), 73.2)
+        self.assertEqual(rates.get_rate('USD'), 60.66)
+        self.assertEqual(rates.get_rate('RUR', '2020-05-01T10:00:00+0300'), 1)
+
+    def test_currency_only_in_file(self):
+        file_name = os.path.join(self.directory, 'rates_cny.csv')
+        with open(file_name, 'w', encoding='utf-8') as file:
+            file.write('date,CNY\n2020-03,9.5\n2020-06,10.5\n')
+        rates = CurrencyRates(file_name)
+        self.assertEqual(rates.get_rate('CNY', '2020-06-01T10:00:00+0300'), 10.5)
+        self.assertEqual(rates.get_rate('CNY', '2020-05-01T10:00:00+0300'), 9.5)
+        self.assertEqual(rates.get_rate('CNY', '2020-01-01T10:00:00+0300'), 9.5)
+        self.assertEqual(rates.get_rate('CNY', '2022-01-01T10:00:00+0300'), 10.5)
+        with self.assertRaises(ValueError):
+            rates.get_rate('GBP', '2020-06-01T10:00:00+0300')
+
+    def test_table_with_file_only_currency(self):
+        file_name = os.path.join(self.directory, 'rates_cny.csv')
+        with open(file_name, 'w', encoding='utf-8') as file:
+            file.write('date,CNY\n2022-07,9.5\n')
+        CurrencyRates.default = CurrencyRates(file_name)
+        csv_name = write_vacancies(self.directory,
+                                   'name,salary_from,salary_to,salary_gross,salary_currency,published_at\n'
+                                   'A,100,200,True,CNY,2022-07-05T18:19:30+0300\n'
+                                   'B,10,20,False,EUR,2022-07-04T18:19:30+0300\n')
+        data_set = table_out.DataSet(csv_name)
+        rows = table_out.InputParam.create_data(data_set, 'Идентификатор валюты оклада: CNY',
+                                                'Идентификатор валюты оклада', 'Нет', fields=['Название', 'Оклад'])
+        self.assertEqual(rows, [['1', 'A', '100 - 200 (CNY) (Без вычета налогов)']])
+        self.assertEqual(data_set.vacancies_objects[0].salary.salary_to_rub, 150 * 9.5)
+
+    def test_json(self):
+        file_name = os.path.join(self.directory, 'rates.json')
+        with open(file_name, 'w', encoding='utf-8') as file:
+            file.write('{"USD": {"2020-01": 61.5, "2020-05": 73.2}, "EUR": {"2020-05": 80.1}}')
+        self.assertEqual(CurrencyRates(file_name).rates, CurrencyRates(self.file_name).rates)
+
+    def test_convert(self):
+        rates = CurrencyRates(self.file_name)
+        currencies = ['USD', 'EUR', 'RUR', 'USD', 'EUR']
+        dates = ['2020-01-01', '2020-01-15', '2020-05-01', '2020-05-30', '2020-05-02']
+        self.assertEqual(rates.convert([10] * 5, currencies, dates).tolist(),
+                         [10 * rates.get_rate(currency, date) for currency, date in zip(currencies, dates)])
+
+    def test_report_by_month(self):
+        CurrencyRates.default = CurrencyRates(self.file_name)
+        csv_name = write_vacancies(self.directory,
+                                   'name,salary_from,salary_to,salary_currency,area_name,published_at\n'
+                                   'Программист,10,30,USD,Москва,2020-01-01T10:00:00+0300\n'
+                                   'Аналитик,10,20,EUR,Казань,2020-05-01T10:00:00+0300\n'
+                                   'Программист,40,60,USD,Москва,2020-05-01T10:00:00+0300\n')
+        stream = report_out.StatsAccumulator('Программист').add_all(report_out.DataSet.iter_vacancies(csv_name))
+        columnar = report_out.ColumnarDataSet(csv_name).get_stats('Программист')
+        self.assertEqual(stream.get_report().__dict__, columnar.get_report().__dict__)
+        self.assertEqual(stream.get_report().salary_cities_filter, {'Казань': 1201, 'Москва': 2445})
+
+
+class DatasetCacheTests(TestCase):
+    def setUp(self):
+        self.directory = temp_directory(self)
+        self.file_name = write_vacancies(self.directory, 'name\nПрограммист\n')
+
+    def test_round_trip(self):
+        DatasetCache.save(self.file_name, 'test', {'name': ['Программист', 'Аналитик'], 'year': np.arange(2)})
+        data = DatasetCache.load(self.file_name, 'test')
+        self.assertEqual(data['name'], ['Программист', 'Аналитик'])
+        self.assertEqual(data['year'].tolist(), [0, 1])
+
+    def test_invalidated_on_change(self):
+        DatasetCache.save(self.file_name, 'test', {'name': ['Программист']})
+        with open(self.file_name, 'a', encoding='utf-8') as file:
+            file.write('Аналитик\n')
+        self.assertIsNone(DatasetCache.load(self.file_name, 'test'))
+
+    def test_empty_and_separator_values(self):
+        DatasetCache.save(self.file_name, 'test', {'name': [''], 'key_skills': ['a\x00b']})
+        self.assertEqual(DatasetCache.load(self.file_name, 'test'), {'name': [''], 'key_skills': ['a\x00b']})
+        DatasetCache.save(self.file_name, 'test', {'name': ['', 'a\x00b', ''], 'key_skills': []})
+        self.assertEqual(DatasetCache.load(self.file_name, 'test'), {'name': ['', 'a\x00b', ''], 'key_skills': []})
+
+    def test_one_row_with_empty_cell(self):
+        file_name = write_vacancies(self.directory, 'name,area_name\n<b></b>,Москва\n')
+        rows = [table_out.DataSet(file_name, cache=True).vacancies_objects for _ in range(2)]
+        self.assertEqual([[(row.name, row.area_name) for row in run] for run in rows], [[('', 'Москва')]] * 2)
+
+    def test_other_tag(self):
+        DatasetCache.save(self.file_name, 'test', {'name': ['Программист']})
+        self.assertIsNone(DatasetCache.load(self.file_name, 'other'))
+
+
+class MappedCsvTests(TestCase):
+    rows = ['name,key_skills,area_name',
+            'Программист,"Git\nLinux",Москва',
+            'Аналитик,SQL,Казань',
+            'Водитель,,Москва',
+            'Менеджер,"Excel\n""1С""\nWord",Пермь']
+
+    def setUp(self):
+        self.file_name = write_vacancies(temp_directory(self), '\n'.join(self.rows))
+
+    def test_heads(self):
+        with MappedCsv(self.file_name) as mapped:
+            self.assertEqual(mapped.heads, ['name', 'key_skills', 'area_name'])
+
+    def test_rows(self):
+        with MappedCsv(self.file_name) as mapped:
+            self.assertEqual(list(mapped.iter_rows([0, 1])),
+                             [['Программист', 'Git\nLinux'], ['Аналитик', 'SQL'], ['Менеджер', 'Excel\n"1С"\nWord']])
+
+    def test_long_cell(self):
+        cell = '\n'.join(f'line{number}' for number in range(1000))
+        write_vacancies(os.path.dirname(self.file_name),
+                        f'name,key_skills,area_name\nA,"{cell}",Москва\nB,SQL,Казань\nC,"Git,Пермь\nD,SQL,Уфа\n')
+        with MappedCsv(self.file_name) as mapped:
+            self.assertEqual(list(mapped.iter_rows([0, 1])), [['A', cell], ['B', 'SQL']])
+
+    def test_crlf(self):
+        with open(self.file_name, 'w', encoding='utf-8-sig', newline='\r\n') as file:
+            file.write('\n'.join(self.rows) + '\n')
+        with MappedCsv(self.file_name) as mapped:
+            self.assertEqual(mapped.heads, ['name', 'key_skills', 'area_name'])
+            self.assertEqual(list(mapped.iter_rows([0, 1, 2])),
+                             [['Программист', 'Git\nLinux', 'Москва'], ['Аналитик', 'SQL', 'Казань'],
+                              ['Менеджер', 'Excel\n"1С"\nWord', 'Пермь']])
+
+    def test_split(self):
+        with MappedCsv(self.file_name) as mapped:
+            whole = list(mapped.iter_rows([0]))
+            for parts in range(1, 8):
+                ranges = mapped.split(parts)
+                self.assertEqual([row for start, end in ranges for row in mapped.iter_rows([0], start, end)], whole)
+
+
+class ProfessionMatcherTests(TestCase):
+    def test_several(self):
+        matcher = ProfessionMatcher(['Программист', 'Python', 'Java', 'Аналитик'])
+        self.assertEqual(matcher.find('Программист Python'), {0, 1})
+
+    def test_overlap(self):
+        matcher = ProfessionMatcher(['ab', 'bc', 'abcd', 'c'])
+        self.assertEqual(matcher.find('xabcx'), {0, 1, 3})
+
+    def test_case(self):
+        self.assertEqual(ProfessionMatcher(['аналитик']).find('Аналитик'), set())
+
+
+class TableIndexTests(TestCase):
+    def test_interval_tree(self):
+        intervals = [(i % 7 * 10, i % 7 * 10 + i % 5 * 15, i) for i in range(50)] + [(300, 250, 50), (80, 40, 51)]
+        tree = IntervalTree(intervals)
+        for point in range(-5, 140, 5):
+            expected = [number for low, high, number in intervals if low <= point <= high]
+            self.assertEqual(sorted(tree.find(point)), expected)
+
+    def test_select_and(self):
+        rows = [{'city': 'A', 'skills': ['Git'], 'salary': (10, 20)},
+                {'city': 'B', 'skills': ['Git', 'SQL'], 'salary': (15, 30)},
+                {'city': 'B', 'skills': ['SQL'], 'salary': (10, 20)}]
+        index = TableIndex(rows, {'city': ('hash', lambda row: row['city']),
+                                  'skills': ('inverted', lambda row: row['skills']),
+                                  'salary': ('interval', lambda row: row['salary'])})
+        self.assertEqual(index.select([('city', 'B'), ('salary', 18)]), rows[1:])
+        self.assertEqual(index.select([('skills', ['SQL', 'Git']), ('salary', 25)]), [rows[1]])
+        self.assertEqual(index.select([('city', 'A'), ('skills', ['SQL'])]), [])
+
+    def test_filter_for_table_out(self):
+        with vacancies_file('name,key_skills,salary_from,salary_to,salary_gross,salary_currency,area_name\n'
+                            'A,"Git\nSQL",100,200,True,RUR,Москва\n'
+                            'B,Git,150,300,False,EUR,Москва\n'
+                            'C,SQL,100,120,True,RUR,Казань\n') as file_name:
+            data_set = table_out.DataSet(file_name)
+            found = table_out.InputParam.do_filter(data_set, 'Название региона: Москва; Оклад: 180; Навыки: Git')
+            self.assertEqual([row.name for row in found], ['A', 'B'])
+            found = table_out.InputParam.do_filter(data_set, 'Идентификатор валюты оклада: Рубли; Навыки: SQL')
+            self.assertEqual([row.name for row in found], ['A', 'C'])
+
+
+class SortTests_for_table_out(TestCase):
+    def test_top(self):
+        with vacancies_file('name,salary_from,salary_to,salary_gross,salary_currency,published_at\n'
+                            'A,100,200,True,RUR,2022-07-05T18:19:30+0300\n'
+                            'B,10,20,False,EUR,2022-07-04T18:19:30+0300\n'
+                            'C,100,300,True,RUR,2022-07-06T18:19:30+0300\n'
+                            'D,1000,2000,True,KZT,2022-07-03T18:19:30+0300\n') as file_name:
+            vacancies = table_out.DataSet(file_name).vacancies_objects
+            for sort in ('Оклад', 'Дата публикации вакансии', 'Название'):
+                for reverse in ('Да', 'Нет'):
+                    full = table_out.InputParam.do_sort(vacancies, sort, reverse)
+                    self.assertEqual(table_out.InputParam.do_sort(vacancies, sort, reverse, 2), full[:2])
+            self.assertEqual([row.name for row in table_out.InputParam.do_sort(vacancies, 'Оклад', 'Да', 2)],
+                             ['B', 'C'])
+
+    def test_page(self):
+        with vacancies_file('name,salary_from,salary_to,salary_gross,salary_currency\n'
+                            'A,1000,20000.0,True,RUR\nB,10,20,False,EUR\nC,100,300,True,RUR\n') as file_name:
+            data_set = table_out.DataSet(file_name)
+            rows = table_out.InputParam.create_data(data_set, '', 'Оклад', 'Нет', 1, 3, ['Название', 'Оклад'])
+            self.assertEqual(rows, [['2', 'B', '10 - 20 (Евро) (С вычетом налогов)'],
+                                    ['3', 'A', '1 000 - 20 000 (Рубли) (Без вычета налогов)']])
+
+    def test_numeric_salary(self):
+        vacancy = table_out.Vacancy({'name': 'A', 'salary_from': '1000.9', 'salary_to': '2000', 'salary_gross': 'Да',
+                                     'salary_currency': 'EUR', 'published_at': '2022-07-05T18:19:30+0300'})
+        self.assertEqual((vacancy.salary.salary_from, vacancy.salary.salary_to), (1000, 2000))
+        self.assertEqual(vacancy.salary.salary_to_rub, (1000 * 59.90 + 2000 * 59.90) / 2)
+        self.assertEqual(vacancy.get_sort_key('Оклад'), vacancy.salary.salary_to_rub)
+        self.assertIsNone(table_out.Vacancy({'name': 'B'}).salary)
+
+
+class TableSessionTests_for_table_out(TestCase):
+    def test_memoized(self):
+        with vacancies_file('name,key_skills,salary_from,salary_to,salary_gross,salary_currency,area_name\n'
+                            'A,"Git\nSQL",100,200,True,RUR,Москва\n'
+                            'B,Git,150,300,False,RUR,Москва\n'
+                            'C,SQL,100,120,True,RUR,Казань\n') as file_name:
+            session = table_out.TableSession(file_name)
+            session.params.update(filter_param='Навыки: Git', sort_param='Оклад', invert_param='Да',
+                                  columns_param='Название')
+            self.assertEqual(session.get_rows(), ([['1', 'B'], ['2', 'A']], ['Название']))
+            sorted_list = session.sorted[('Навыки: Git', 'Оклад', 'Да')]
+            session.params['range_param'] = '2'
+            self.assertEqual(session.get_rows()[0], [['2', 'A']])
+            self.assertIs(session.get_sorted('Навыки: Git', 'Оклад', 'Да'), sorted_list)
+            output = io.StringIO()
+            with redirect_stdout(output):
+                self.assertTrue(session.execute('Столбцы: Название, Оклат'))
+            self.assertEqual(output.getvalue(), 'Столбцы заданы некорректно\n')
+            self.assertEqual(session.params['columns_param'], 'Название')
@@ -0,0 +1,263 @@
+import os
+import numpy as np
+import pandas as pd
+from text_cleaner import Cleaner
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+class ColumnarWriter:
+    """Дописывает куски вакансий, подготовленные ColumnarStore.prepare, в один файл части Parquet или Arrow IPC.
+    Для колонок со словарем хранится общий для всего файла словарь значений: новые значения добавляются в его
+    конец, поэтому в файл Arrow IPC пишутся только дополнения словаря, а не его замена
+
+        Attributes:
+            schema (pyarrow.Schema): Схема файла
+            dictionaries (dict): Название колонки -> словарь значение -> код
+            writer: Объект записи pyarrow
+    """
+
+    def __init__(self, file_name, file_format, data):
+        """Инициализирует объект ColumnarWriter и открывает файл
+
+            Args:
+                file_name (str): Путь к файлу части
+                file_format (str): 'parquet' или 'feather'
+                data (DataFrame): Подготовленный кусок, по нему определяется схема
+        """
+        self.schema = ColumnarStore.get_schema(data.columns)
+        self.dictionaries = {name: {} for name in data.columns if name in ColumnarStore.dictionary_columns}
+        if file_format == 'parquet':
+            self.writer = pq.ParquetWriter(file_name, self.schema, compression='zstd')
+        else:
+            options = ipc.IpcWriteOptions(compression='zstd', emit_dictionary_deltas=True)
+            self.writer = ipc.new_file(file_name, self.schema, options=options)
+
+    def encode(self, name, values):
+        """Кодирует значения колонки общим словарем файла
+
+            Args:
+                name (str): Название колонки
+                values (Series): Значения
+
+            Returns:
+                pyarrow.DictionaryArray: Коды и весь словарь колонки
+        """
+        dictionary = self.dictionaries[name]
+        for value in values.unique():
+            if value not in dictionary:
+                dictionary[value] = len(dictionary)
+        indices = pa.array(values.map(dictionary).to_numpy(np.int32))
+        return pa.DictionaryArray.from_arrays(indices, pa.array(list(dictionary), pa.string()))
+
+    def write(self, data):
+        """Дописывает кусок в файл
+
+            Args:
+                data (DataFrame): Подготовленный кусок
+        """
+        arrays = []
+        for field in self.schema:
+            if field.name in self.dictionaries:
+                arrays.append(self.encode(field.name, data[field.name]))
+            elif field.name == 'published_at':
+                arrays.append(pa.array(data[field.name].to_numpy(np.int64)).cast(field.type))
+            else:
+                arrays.append(pa.array(data[field.name].to_numpy(), field.type))
+        self.writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+class ColumnarStore:
+    """Класс хранит части файла вакансий в колоночных форматах Parquet и Arrow IPC (Feather) и читает их.
+    Строки с пустыми ячейками в части не попадают, текст очищен Cleaner.clean_text, зарплаты хранятся
+    как float64, дата публикации - как время UTC в секундах со смещением часового пояса в минутах, валюта,
+    регион и другие колонки с небольшим числом значений - со словарем. Колонка year нужна для отбора по году
+    при чтении: в Parquet по статистике групп строк пропускаются группы без нужных годов и регионов
+
+        Attributes:
+            formats (dict): Формат -> расширение файла части
+            extensions (dict): Расширение файла -> формат pyarrow.dataset
+            float_columns (tuple): Колонки с числами
+            dictionary_columns (tuple): Колонки со словарем
+            service_columns (tuple): Служебные колонки, которые не возвращаются при чтении
+            date_format (str): Формат даты публикации без часового пояса
+    """
+    formats = {'parquet': '.parquet', 'feather': '.feather'}
+    extensions = {'.parquet': 'parquet', '.feather': 'ipc', '.arrow': 'ipc'}
+    float_columns = ('salary_from', 'salary_to')
+    dictionary_columns = ('experience_id', 'premium', 'salary_gross', 'salary_currency', 'area_name')
+    service_columns = ('year', 'published_offset')
+    date_format = '%Y-%m-%dT%H:%M:%S'
+
+    @staticmethod
+    def is_columnar(file_name):
+        """Проверяет по расширению, является ли файл колоночным
+
+            Args:
+                file_name (str): Название файла
+
+            Returns:
+                bool: True - для .parquet, .feather и .arrow
+
+            >>> ColumnarStore.is_columnar('csv_files/part_2022.parquet')
+            True
+            >>> ColumnarStore.is_columnar('vacancies.csv')
+            False
+        """
+        return os.path.splitext(file_name)[1] in ColumnarStore.extensions
+
+    @staticmethod
+    def get_schema(columns):
+        """Возвращает схему файла части для колонок подготовленного куска
+
+            Args:
+                columns (iterable): Названия колонок
+
+            Returns:
+                pyarrow.Schema: Схема
+        """
+        types = {'year': pa.int16(), 'published_offset': pa.int16(),
+                 'published_at': pa.timestamp('s', tz='UTC')}
+        fields = []
+        for name in columns:
+            if name in ColumnarStore.float_columns:
+                fields.append(pa.field(name, pa.float64()))
+            elif name in ColumnarStore.dictionary_columns:
+                fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+            else:
+                fields.append(pa.field(name, types.get(name, pa.string())))
+        return pa.schema(fields)
+
+    @staticmethod
+    def prepare(chunk, years):
+        """Очищает и типизирует кусок файла, прочитанный как строки
+
+            Args:
+                chunk (DataFrame): Кусок файла без пустых ячеек
+                years (Series): Годы публикации строк куска
+
+            Returns:
+                DataFrame: Кусок с колонкой year, а при наличии даты публикации - с колонкой published_offset
+        """
+        data = {}
+        for name in chunk.columns:
+            values = chunk[name].map(Cleaner.clean_text)
+            if name in ColumnarStore.float_columns:
+                values = values.astype(np.float64)
+            elif name == 'published_at':
+                moments = pd.to_datetime(values, format=ColumnarStore.date_format + '%z', utc=True)
+                local = pd.to_datetime(values.str[:19], format=ColumnarStore.date_format)
+                seconds = (moments.dt.tz_localize(None) - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+                data['published_offset'] = ((local - pd.Timestamp(0)) // pd.Timedelta(seconds=1) - seconds) // 60
+                values = seconds
+            data[name] = values
+        data['year'] = years.astype(np.int16)
+        return pd.DataFrame(data, index=chunk.index)
+
+    @staticmethod
+    def get_writer(file_name, file_format, data):
+        """Открывает файл части для записи
+
+            Args:
+                file_name (str): Путь к файлу части
+                file_format (str): 'parquet' или 'feather'
+                data (DataFrame): Первый подготовленный кусок части
+
+            Returns:
+                ColumnarWriter: Объект записи
+        """
+        if pa is None:
+            raise ImportError('Для колоночных форматов нужна библиотека pyarrow')
+        return ColumnarWriter(file_name, file_format, data)
+
+    @staticmethod
+    def get_filter(years=None, areas=None):
+        """Составляет условие отбора строк для pyarrow.dataset
+
+            Args:
+                years (iterable or None): Нужные годы публикации, None - все годы
+                areas (iterable or None): Нужные регионы, None - все регионы
+
+            Returns:
+                pyarrow.compute.Expression or None: Условие или None, если отбирать не нужно
+        """
+        condition = None
+        if years is not None:
+            condition = ds.field('year').isin([int(year) for year in years])
+        if areas is not None:
+            area_condition = ds.field('area_name').isin(list(areas))
+            condition = area_condition if condition is None else condition & area_condition
+        return condition
+
+    @staticmethod
+    def get_dates(table):
+        """Восстанавливает исходные строки даты публикации вида 2022-07-05T18:19:30+0300
+
+            Args:
+                table (pyarrow.Table): Таблица с колонками published_at и published_offset
+
+            Returns:
+                list: Строки дат
+        """
+        seconds = table['published_at'].cast(pa.timestamp('s', tz='UTC')).cast(pa.int64()).to_numpy()
+        offsets = table['published_offset'].to_numpy().astype(np.int64)
+        local = np.datetime_as_string((seconds + offsets * 60).astype('datetime64[s]'), unit='s')
+        zones = {offset: '%s%02d%02d' % ('-' if offset < 0 else '+', abs(offset) // 60, abs(offset) % 60)
+                 for offset in np.unique(offsets).tolist()}
+        return [date + zones[offset] for date, offset in zip(local.tolist(), offsets.tolist())]
+
+    @staticmethod
+    def get_values(column, clean):
+        """Переводит колонку в список значений Python. Текст словарных колонок очищается один раз
+        для каждого значения словаря
+
+            Args:
+                column (pyarrow.ChunkedArray): Колонка
+                clean (function): Функция очистки текста
+
+            Returns:
+                list: Значения колонки
+        """
+        if pa.types.is_floating(column.type):
+            return column.to_numpy().tolist()
+        if not pa.types.is_dictionary(column.type):
+            return [clean(value) for value in column.to_pylist()]
+        values = []
+        for chunk in column.chunks:
+            dictionary = np.array([clean(value) for value in chunk.dictionary.to_pylist()] or [''], dtype=object)
+            values.extend(dictionary[chunk.indices.to_numpy(zero_copy_only=False)].tolist())
+        return values
+
+    @staticmethod
+    def read(file_name, columns=None, years=None, areas=None, clean=Cleaner.clean_text):
+        """Читает колоночный файл части: читаются только нужные колонки, а строки отбираются по году
+        и региону при чтении
+
+            Args:
+                file_name (str): Название файла .parquet, .feather или .arrow
+                columns (iterable or None): Нужные колонки, None - все колонки файла
+                years (iterable or None): Нужные годы публикации, None - все годы
+                areas (iterable or None): Нужные регионы, None - все регионы
+                clean (function): Функция очистки текста, которой вид вывода дополняет нейтральную очистку
+
+            Returns:
+                dict: Название колонки -> список значений, дата публикации - исходной строкой
+        """
+        if pa is None:
+            raise ImportError('Для колоночных форматов нужна библиотека pyarrow')
+        dataset = ds.dataset(file_name, format=ColumnarStore.extensions[os.path.splitext(file_name)[1]])
+        names = [name for name in dataset.schema.names
+                 if name not in ColumnarStore.service_columns and (columns is None or name in columns)]
+        read_names = names + ['published_offset'] if 'published_at' in names else names
+        table = dataset.to_table(columns=read_names, filter=ColumnarStore.get_filter(years, areas))
+        return {name: ColumnarStore.get_dates(table) if name == 'published_at' else
+                ColumnarStore.get_values(table[name], clean) for name in names}
@@ -0,0 +1,163 @@
+import bisect
+import csv
+import json
+import os
+import numpy as np
+
+
+class CurrencyRates:
+    """Класс переводит зарплаты в рубли по курсу месяца публикации вакансии. Курсы по месяцам загружаются
+    из файла, путь к которому берется из переменной окружения CURRENCY_RATES: csv с колонкой date (ГГГГ-ММ)
+    и колонкой на каждую валюту или json вида {"USD": {"2022-07": 60.66}}. Курс - количество рублей за единицу
+    валюты. Если в файле есть курсы валюты, но нет курса за нужный месяц, берется курс из файла за ближайший
+    предыдущий месяц (или за первый месяц файла). Постоянный курс из static_rates берется только для валют,
+    которых в файле нет, и когда дата не указана.
+    Загруженные курсы хранятся в instances, поэтому файл читается один раз на процесс, а переменная окружения
+    читается при первом обращении к курсам по умолчанию
+
+        Attributes:
+            static_rates (dict): Валюта -> постоянный курс
+            environment_variable (str): Переменная окружения с путем к файлу курсов
+            instances (dict): Путь к файлу курсов -> объект CurrencyRates
+            default (CurrencyRates or None): Курсы по умолчанию, None - еще не загружены
+            file_name (str or None): Путь к файлу курсов
+            rates (dict): Валюта -> {месяц ГГГГ-ММ: курс}
+            months (dict): Валюта -> отсортированные месяцы с курсом в файле
+    """
+    static_rates = {"AZN": 35.68,
+                    "BYR": 23.91,
+                    "EUR": 59.90,
+                    "GEL": 21.74,
+                    "KGS": 0.76,
+                    "KZT": 0.13,
+                    "RUR": 1,
+                    "UAH": 1.64,
+                    "USD": 60.66,
+                    "UZS": 0.0055}
+    environment_variable = 'CURRENCY_RATES'
+    instances = {}
+    default = None
+
+    def __init__(self, file_name=None):
+        """Инициализирует объект CurrencyRates и читает файл курсов
+
+            Args:
+                file_name (str or None): Путь к файлу курсов, None - только постоянные курсы
+        """
+        self.file_name = file_name
+        self.rates = CurrencyRates.read(file_name) if file_name else {}
+        self.months = {currency: sorted(months) for currency, months in self.rates.items()}
+
+    @staticmethod
+    def get(file_name=None):
+        """Возвращает курсы, загружая файл при первом обращении
+
+            Args:
+                file_name (str or None): Путь к файлу курсов, по умолчанию - переменная окружения CURRENCY_RATES
+
+            Returns:
+                CurrencyRates: Курсы валют
+        """
+        if file_name is None:
+            if CurrencyRates.default is None:
+                CurrencyRates.default = CurrencyRates.get(os.environ.get(CurrencyRates.environment_variable, ''))
+            return CurrencyRates.default
+        instance = CurrencyRates.instances.get(file_name)
+        if instance is None:
+            instance = CurrencyRates.instances[file_name] = CurrencyRates(file_name or None)
+        return instance
+
+    @staticmethod
+    def read(file_name):
+        """Читает курсы из csv или json файла
+
+            Args:
+                file_name (str): Путь к файлу курсов
+
+            Returns:
+                dict: Валюта -> {месяц ГГГГ-ММ: курс}
+        """
+        rates = {}
+        if file_name.endswith('.json'):
+            with open(file_name, encoding='utf-8') as file:
+                for currency, months in json.load(file).items():
+                    rates[currency] = {month[:7]: float(rate) for month, rate in months.items()}
+            return rates
+        with open(file_name, encoding='utf-8-sig') as file:
+            for row in csv.DictReader(file):
+                month = row.pop('date')[:7]
+                for currency, rate in row.items():
+                    if rate:
+                        rates.setdefault(currency, {})[month] = float(rate)
+        return rates
+
+    def get_rate(self, currency, date=None):
+        """Возвращает курс валюты за месяц даты
+
+            Args:
+                currency (str): Код валюты
+                date (str or None): Дата публикации или месяц ГГГГ-ММ, None - постоянный курс (для валюты
+                    без постоянного курса - курс за последний месяц файла)
+
+            Returns:
+                float: Количество рублей за единицу валюты
+
+            Raises:
+                ValueError: Курса валюты нет ни в файле, ни в static_rates
+
+            >>> CurrencyRates().get_rate('EUR', '2022-07-05T18:19:30+0300')
+            59.9
+            >>> CurrencyRates().get_rate('CNY', '2022-07')
+            Traceback (most recent call last):
+            ...
+            ValueError: Неизвестная валюта: CNY
+        """
+        months = self.rates.get(currency)
+        if months and date:
+            rate = months.get(date[:7])
+            if rate is not None:
+                return rate
+            known = self.months[currency]
+            return months[known[max(bisect.bisect_left(known, date[:7]) - 1, 0)]]
+        rate = CurrencyRates.static_rates.get(currency)
+        if rate is not None:
+            return rate
+        if not months:
+            raise ValueError(f'Неизвестная валюта: {currency}')
+        return months[self.months[currency][-1]]
+
+    def get_table(self, currencies, months):
+        """Возвращает таблицу курсов для всех пар валюта - месяц
+
+            Args:
+                currencies (list): Коды валют
+                months (list): Месяцы ГГГГ-ММ
+
+            Returns:
+                np.ndarray: Курсы, строка - валюта, столбец - месяц (float64)
+        """
+        table = np.empty((len(currencies), len(months)), dtype=np.float64)
+        for i, currency in enumerate(currencies):
+            for j, month in enumerate(months):
+                table[i, j] = self.get_rate(currency, month)
+        return table
+
+    def convert(self, amounts, currencies, months):
+        """Переводит массив сумм в рубли одной векторной операцией: курс ищется один раз для каждой пары
+        валюта - месяц, а для строк выбирается из таблицы курсов по индексам
+
+            Args:
+                amounts (array_like): Суммы
+                currencies (array_like): Коды валют сумм
+                months (array_like): Даты публикации или месяцы ГГГГ-ММ сумм
+
+            Returns:
+                np.ndarray: Суммы в рублях (float64)
+
+            >>> CurrencyRates().convert([10, 20], ['RUR', 'EUR'], ['2022-07', '2022-07']).tolist()
+            [10.0, 1198.0]
+        """
+        currency_labels, currency_codes = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+        month_labels, month_codes = np.unique(np.asarray(months, dtype=str).astype('U7'), return_inverse=True)
+        table = self.get_table(currency_labels.tolist(), month_labels.tolist())
+        return np.asarray(amounts, dtype=np.float64) * table[currency_codes, month_codes]
@@ -0,0 +1,150 @@
+import hashlib
+import os
+import numpy as np
+
+
+class DatasetCache:
+    """Класс хранит очищенные колонки прочитанных csv файлов в бинарных npz файлах в папке .vacancy_cache
+    рядом с исходным файлом. Ключ кэша - путь, размер и время изменения файла, поэтому при изменении csv
+    файла старая запись перестает подходить и удаляется. Общий размер кэша ограничен max_size,
+    при превышении удаляются давно не использованные записи. Строковая колонка хранится одним буфером
+    значений через separator и длинами значений: по длинам восстанавливаются и пустые значения,
+    и значения, содержащие separator
+
+        Attributes:
+            directory_name (str): Название папки кэша
+            max_size (int): Максимальный размер папки кэша в байтах
+            separator (str): Разделитель значений строковой колонки в буфере
+            lengths_prefix (str): Префикс массивов с длинами значений строковых колонок
+    """
+    directory_name = '.vacancy_cache'
+    max_size = 1024 ** 3
+    separator = '\x00'
+    lengths_prefix = '__lengths__'
+
+    @staticmethod
+    def get_paths(file_name, tag):
+        """Возвращает папку кэша, префикс записей исходного файла и путь к записи для текущей версии файла
+
+            Args:
+                file_name (str): Название csv файла
+                tag (str): Вид и набор сохраняемых колонок
+
+            Returns:
+                Tuple (str, str, str): Папка кэша, префикс записей файла и путь к записи
+        """
+        path = os.path.abspath(file_name)
+        stat = os.stat(path)
+        directory = os.path.join(os.path.dirname(path), DatasetCache.directory_name)
+        prefix = hashlib.sha1(f'{path}|{tag}'.encode()).hexdigest()[:16]
+        fingerprint = hashlib.sha1(f'{stat.st_size}|{stat.st_mtime_ns}'.encode()).hexdigest()[:16]
+        return directory, prefix, os.path.join(directory, f'{prefix}-{fingerprint}.npz')
+
+    @staticmethod
+    def load(file_name, tag):
+        """Загружает колонки из кэша
+
+            Args:
+                file_name (str): Название csv файла
+                tag (str): Вид и набор сохраняемых колонок
+
+            Returns:
+                dict or None: Название колонки -> np.ndarray или list строк, None - если записи нет
+        """
+        path = DatasetCache.get_paths(file_name, tag)[2]
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                strings = set(data['__strings__'].tolist())
+                columns = {}
+                for name in data.files:
+                    if name == '__strings__' or name.startswith(DatasetCache.lengths_prefix):
+                        continue
+                    if name in strings:
+                        columns[name] = DatasetCache.split(data[name].tobytes().decode('utf-8'),
+                                                           data[DatasetCache.lengths_prefix + name])
+                    else:
+                        columns[name] = data[name]
+        except (OSError, ValueError, KeyError):
+            return None
+        os.utime(path)
+        return columns
+
+    @staticmethod
+    def split(text, lengths):
+        """Разбивает буфер строковой колонки на значения. Если ни одно значение не содержит separator, буфер
+        разбивается по разделителю, иначе - по длинам значений
+
+            Args:
+                text (str): Значения через separator
+                lengths (np.ndarray): Длины значений в символах
+
+            Returns:
+                list: Значения колонки
+
+            >>> DatasetCache.split('', np.array([0]))
+            ['']
+            >>> DatasetCache.split('a\\x00b\\x00c', np.array([3, 1]))
+            ['a\\x00b', 'c']
+        """
+        if len(lengths) == 0:
+            return []
+        values = text.split(DatasetCache.separator)
+        if len(values) == len(lengths):
+            return values
+        ends = np.cumsum(lengths + 1).tolist()
+        return [text[end - length - 1:end - 1] for end, length in zip(ends, lengths.tolist())]
+
+    @staticmethod
+    def save(file_name, tag, columns):
+        """Сохраняет колонки в кэш, удаляя устаревшие записи этого файла и, при необходимости, старые записи
+        других файлов
+
+            Args:
+                file_name (str): Название csv файла
+                tag (str): Вид и набор сохраняемых колонок
+                columns (dict): Название колонки -> np.ndarray или list строк
+        """
+        directory, prefix, path = DatasetCache.get_paths(file_name, tag)
+        arrays = {}
+        strings = []
+        for name, values in columns.items():
+            if isinstance(values, np.ndarray):
+                arrays[name] = values
+            else:
+                strings.append(name)
+                text = DatasetCache.separator.join(values).encode('utf-8')
+                arrays[name] = np.frombuffer(text, dtype=np.uint8)
+                arrays[DatasetCache.lengths_prefix + name] = np.fromiter(map(len, values), dtype=np.int64,
+                                                                         count=len(values))
+        arrays['__strings__'] = np.array(strings, dtype=str)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for name in os.listdir(directory):
+                if name.startswith(prefix + '-'):
+                    os.remove(os.path.join(directory, name))
+            temp_path = path + '.tmp'
+            with open(temp_path, 'wb') as file:
+                np.savez(file, **arrays)
+            os.replace(temp_path, path)
+            DatasetCache.evict(directory)
+        except OSError:
+            pass
+
+    @staticmethod
+    def evict(directory):
+        """Удаляет давно не использованные записи, пока размер папки кэша больше max_size
+
+            Args:
+                directory (str): Папка кэша
+        """
+        entries = []
+        for name in os.listdir(directory):
+            stat = os.stat(os.path.join(directory, name))
+            entries.append((stat.st_mtime_ns, stat.st_size, name))
+        entries.sort()
+        total = sum(entry[1] for entry in entries)
+        for _, size, name in entries[:-1]:
+            if total <= DatasetCache.max_size:
+                break
+            os.remove(os.path.join(directory, name))
+            total -= size
@@ -2,16 +2,27 @@ import table_out
 import report_out
 
 """"Предоставляет возможность выбора вывода табличных данных вакансий либо формирования
-    графиков и отчетов в виде ввода команд: Вакансии или Статистика
+    графиков и отчетов в виде ввода команд: Вакансии, Сессия вакансий, Статистика, Статистика по профессиям
+    или Обновление статистики. Вакансии и Сессия вакансий берут очищенные колонки из кэша DatasetCache
+    (папка .vacancy_cache рядом с файлом), Статистика читает файл построчно и кэш не использует.
+    Команды выполняются только при запуске main.py, а не при импорте: процессы ProcessPoolExecutor, запущенные
+    способом spawn (Windows, macOS), импортируют главный модуль заново и не должны ждать ввода
 """
 
-type_out = input("Введите вид формирования данных: ")
-if type_out == 'Вакансии':
-    table_out.InputParam()
-elif type_out == 'Статистика':
-    report_out.get_table()
-else:
-    print('Неверный ввод!')
+if __name__ == '__main__':
+    type_out = input("Введите вид формирования данных: ")
+    if type_out == 'Вакансии':
+        table_out.InputParam(cache=True)
+    elif type_out == 'Сессия вакансий':
+        table_out.TableSession(input("Введите название файла: "), cache=True).run()
+    elif type_out == 'Статистика':
+        report_out.get_table()
+    elif type_out == 'Статистика по профессиям':
+        report_out.get_batch_tables()
+    elif type_out == 'Обновление статистики':
+        report_out.update_table()
+    else:
+        print('Неверный ввод!')
 
 
 #Main нужен для того, чтобы объединить работу двух файлов
\ No newline at end of file
@@ -0,0 +1,151 @@
+import csv
+import mmap
+
+
+class MappedCsv:
+    """Класс читает csv файл через mmap, не загружая и не декодируя его целиком. Границы строк ищутся с учетом
+    ячеек в кавычках, которые могут содержать переносы строк (например, key_skills). Из строки декодируются
+    только нужные ячейки, а файл можно разбить на непересекающиеся диапазоны байтов для разных процессов
+
+        Attributes:
+            file_name (str): Название файла
+            heads (list): Названия колонок
+            data_start (int): Смещение первой строки с данными
+            size (int): Размер файла в байтах
+    """
+    chunk_size = 1 << 20
+
+    def __init__(self, file_name):
+        """Инициализирует объект MappedCsv и читает заголовок файла
+
+            Args:
+                file_name (str): Название файла
+        """
+        self.file_name = file_name
+        self.file = open(file_name, 'rb')
+        self.size = self.file.seek(0, 2)
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        start = 3 if self.map[:3] == b'\xef\xbb\xbf' else 0
+        self.heads = []
+        self.data_start = start
+        for position, row in self.iter_row_bytes(start, self.size):
+            self.heads = next(csv.reader([row.decode('utf-8')]), [])
+            self.data_start = position
+            break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Закрывает отображение и файл"""
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+        self.file.close()
+
+    def count_quotes(self, start, end):
+        """Считает кавычки в диапазоне байтов, просматривая файл кусками по chunk_size
+
+            Args:
+                start (int): Начало диапазона
+                end (int): Конец диапазона (не включается)
+
+            Returns:
+                int: Количество символов '"'
+        """
+        count = 0
+        for position in range(start, end, MappedCsv.chunk_size):
+            count += self.map[position:min(position + MappedCsv.chunk_size, end)].count(b'"')
+        return count
+
+    def iter_row_bytes(self, start, end):
+        """Возвращает байты строк, начинающихся в диапазоне [start, end). start должен быть началом строки.
+        Если в строке нечетное количество кавычек, к ней добавляются следующие строки файла, пока количество
+        не станет четным; кавычки считаются только в добавленной строке, а байты строки вырезаются один раз,
+        поэтому время работы линейно и для ячеек из многих строк
+
+            Args:
+                start (int): Начало диапазона
+                end (int): Конец диапазона
+
+            Yields:
+                Tuple (int, bytes): Смещение следующей строки и байты текущей строки без перевода строки
+        """
+        position = start
+        while position < end:
+            line_end = self.map.find(b'\n', position)
+            if line_end == -1:
+                line_end = self.size
+            row = self.map[position:line_end]
+            quotes = row.count(b'"')
+            if quotes % 2:
+                while quotes % 2 and line_end < self.size:
+                    next_end = self.map.find(b'\n', line_end + 1)
+                    if next_end == -1:
+                        next_end = self.size
+                    quotes += self.map[line_end + 1:next_end].count(b'"')
+                    line_end = next_end
+                row = self.map[position:line_end]
+            position = line_end + 1
+            yield position, row.rstrip(b'\r')
+
+    def split(self, parts):
+        """Разбивает данные файла на диапазоны байтов примерно одинакового размера, начинающиеся с начала строки.
+        Для этого файл один раз просматривается с подсчетом кавычек
+
+            Args:
+                parts (int): Желаемое количество диапазонов
+
+            Returns:
+                list: Список пар (начало, конец)
+        """
+        bounds = [self.data_start]
+        position = self.data_start
+        quotes = 0
+        for i in range(1, parts):
+            target = self.data_start + (self.size - self.data_start) * i // parts
+            if target <= position:
+                continue
+            quotes += self.count_quotes(position, target)
+            position = target
+            while position < self.size:
+                line_end = self.map.find(b'\n', position)
+                if line_end == -1:
+                    line_end = self.size
+                quotes += self.count_quotes(position, line_end + 1)
+                position = line_end + 1
+                if quotes % 2 == 0:
+                    break
+            if position >= self.size:
+                break
+            bounds.append(position)
+        bounds.append(self.size)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def iter_rows(self, indexes, start=None, end=None):
+        """Возвращает значения нужных колонок строк без пустых ячеек и с правильным количеством ячеек.
+        Декодируются только нужные ячейки, строки с кавычками разбираются модулем csv. Переводы строк \\r\\n внутри
+        ячеек в кавычках заменяются на \\n, как при чтении файла в текстовом режиме
+
+            Args:
+                indexes (list): Номера нужных колонок
+                start (int or None): Начало диапазона, по умолчанию - первая строка с данными
+                end (int or None): Конец диапазона, по умолчанию - конец файла
+
+            Yields:
+                list: Декодированные значения нужных колонок
+        """
+        start = self.data_start if start is None else start
+        end = self.size if end is None else end
+        length = len(self.heads)
+        for _, row in self.iter_row_bytes(start, end):
+            if b'"' in row:
+                fields = next(csv.reader([row.replace(b'\r\n', b'\n').decode('utf-8')]), [])
+                if len(fields) == length and '' not in fields:
+                    yield [fields[i] for i in indexes]
+                continue
+            fields = row.split(b',')
+            if len(fields) == length and b'' not in fields:
+                yield [fields[i].decode('utf-8') for i in indexes]
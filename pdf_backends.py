@@ -0,0 +1,138 @@
+import base64
+import os
+import shutil
+from pathlib import Path
+
+
+class WeasyPrintBackend:
+    """Формирует pdf из html внутри процесса библиотекой WeasyPrint (нужны системные библиотеки Pango)"""
+
+    def __init__(self):
+        import weasyprint
+        self.html_class = weasyprint.HTML
+
+    def render(self, html, file_name):
+        """Сохраняет html в pdf файл
+
+            Args:
+                html (str): Html страница
+                file_name (str): Путь к pdf файлу
+        """
+        self.html_class(string=html, base_url='.').write_pdf(file_name)
+
+
+class Xhtml2PdfBackend:
+    """Формирует pdf из html внутри процесса библиотекой xhtml2pdf, написанной на чистом Python.
+    Для кириллицы подключается шрифт DejaVu Sans, который поставляется вместе с matplotlib
+    """
+
+    def __init__(self):
+        import matplotlib
+        from xhtml2pdf import pisa
+        self.pisa = pisa
+        font = Path(matplotlib.get_data_path(), 'fonts', 'ttf', 'DejaVuSans.ttf')
+        self.style = ('<style>@font-face {font-family: Verdana; src: url("%s");} '
+                      'body {font-family: Verdana;}</style>' % font.as_posix())
+        self.options = {}
+        try:
+            from xhtml2pdf.config.resources import ResourceAccessPolicy
+            self.options['resource_policy'] = ResourceAccessPolicy(extra_roots=(font.parent,))
+        except ImportError:
+            pass
+
+    def render(self, html, file_name):
+        """Сохраняет html в pdf файл
+
+            Args:
+                html (str): Html страница
+                file_name (str): Путь к pdf файлу
+        """
+        html = html.replace('</head>', self.style + '</head>', 1)
+        with open(file_name, 'wb') as file:
+            result = self.pisa.CreatePDF(html, dest=file, encoding='utf-8', **self.options)
+        if result.err:
+            raise RuntimeError(f'xhtml2pdf не смог сформировать {file_name}')
+
+
+class WkhtmltopdfBackend:
+    """Формирует pdf внешней программой wkhtmltopdf через pdfkit. Путь к программе берется из переменной окружения
+    WKHTMLTOPDF, из PATH или из стандартной папки установки в Windows
+    """
+    windows_path = r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe'
+
+    def __init__(self):
+        import pdfkit
+        self.pdfkit = pdfkit
+        path = os.environ.get('WKHTMLTOPDF') or shutil.which('wkhtmltopdf') or WkhtmltopdfBackend.windows_path
+        self.config = pdfkit.configuration(wkhtmltopdf=path)
+
+    def render(self, html, file_name):
+        """Сохраняет html в pdf файл
+
+            Args:
+                html (str): Html страница
+                file_name (str): Путь к pdf файлу
+        """
+        self.pdfkit.from_string(html, file_name, configuration=self.config,
+                                options={"enable-local-file-access": None})
+
+
+class PdfBackends:
+    """Класс выбирает способ формирования pdf. Объекты способов создаются один раз на процесс,
+    поэтому много отчетов формируются без повторной загрузки библиотек
+
+        Attributes:
+            backends (dict): Название способа -> класс
+            auto_order (tuple): Порядок перебора способов при выборе 'auto'
+    """
+    backends = {'weasyprint': WeasyPrintBackend,
+                'xhtml2pdf': Xhtml2PdfBackend,
+                'wkhtmltopdf': WkhtmltopdfBackend}
+    auto_order = ('weasyprint', 'xhtml2pdf', 'wkhtmltopdf')
+    instances = {}
+
+    @staticmethod
+    def get(name=None):
+        """Возвращает объект способа формирования pdf
+
+            Args:
+                name (str or None): Название способа или 'auto', по умолчанию - переменная окружения
+                    REPORT_PDF_BACKEND или 'auto' (первый доступный способ из auto_order)
+
+            Returns:
+                object: Объект с методом render(html, file_name)
+        """
+        name = name or os.environ.get('REPORT_PDF_BACKEND', 'auto')
+        if name in PdfBackends.instances:
+            return PdfBackends.instances[name]
+        if name != 'auto':
+            backend = PdfBackends.backends[name]()
+        else:
+            backend = None
+            for candidate in PdfBackends.auto_order:
+                try:
+                    backend = PdfBackends.backends[candidate]()
+                    break
+                except (ImportError, OSError):
+                    continue
+            if backend is None:
+                raise RuntimeError('Не найдено ни одного способа формирования pdf')
+        PdfBackends.instances[name] = backend
+        return backend
+
+    @staticmethod
+    def to_data_uri(image, image_format='png'):
+        """Переводит изображение в data URI, чтобы встроить его в html без временного файла
+
+            Args:
+                image (bytes): Содержимое изображения
+                image_format (str): 'png' или 'svg'
+
+            Returns:
+                str: Data URI
+
+            >>> PdfBackends.to_data_uri(b'abc')
+            'data:image/png;base64,YWJj'
+        """
+        mime = 'image/svg+xml' if image_format == 'svg' else f'image/{image_format}'
+        return f'data:{mime};base64,' + base64.b64encode(image).decode('ascii')
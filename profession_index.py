@@ -0,0 +1,73 @@
+from collections import deque
+
+
+class ProfessionMatcher:
+    """Класс ищет, какие из названий профессий входят подстрокой в название вакансии, за один проход по строке
+    (автомат Ахо-Корасик). Результаты для уже встречавшихся названий вакансий запоминаются
+
+        Attributes:
+            keys (list): Названия профессий
+    """
+
+    def __init__(self, keys):
+        """Инициализирует объект ProfessionMatcher и строит автомат
+
+            Args:
+                keys (list): Названия профессий
+        """
+        self.keys = list(keys)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+        for index, key in enumerate(self.keys):
+            node = 0
+            for char in key:
+                child = self.goto[node].get(char)
+                if child is None:
+                    child = len(self.goto)
+                    self.goto[node][char] = child
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(set())
+                node = child
+            self.output[node].add(index)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+                self.output[child] |= self.output[self.fail[child]]
+        self.output = [frozenset(output) for output in self.output]
+        self.found = {}
+
+    def find(self, text):
+        """Возвращает номера профессий, названия которых входят в text
+
+            Args:
+                text (str): Название вакансии
+
+            Returns:
+                frozenset: Номера профессий в списке keys
+
+            >>> sorted(ProfessionMatcher(['Программист', 'Python', 'Java']).find('Программист Python'))
+            [0, 1]
+            >>> ProfessionMatcher(['аналитик']).find('Аналитик')
+            frozenset()
+        """
+        found = self.found.get(text)
+        if found is not None:
+            return found
+        result = set(self.output[0])
+        node = 0
+        for char in text:
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            result |= self.output[node]
+        found = self.found[text] = frozenset(result)
+        return found
@@ -1,13 +1,33 @@
 import csv
+import hashlib
+import json
+import math
+from array import array
+import os
 import re
-import matplotlib.pyplot as plt
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from itertools import repeat
+from pathlib import Path
+import time
 from datetime import datetime
 import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from openpyxl import Workbook
 from openpyxl.styles import Font, Border, Side
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles.numbers import FORMAT_PERCENTAGE_00
-from jinja2 import Environment, FileSystemLoader
-import pdfkit
+from openpyxl.utils import get_column_letter
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from columnar_store import ColumnarStore
+from currency_rates import CurrencyRates
+from dataset_cache import DatasetCache
+from mmap_reader import MappedCsv
+from pdf_backends import PdfBackends
+from profession_index import ProfessionMatcher
+from text_cleaner import Cleaner
 
 
 class Tools:
@@ -48,61 +68,67 @@ class Tools:
             >>> Tools.prepare('')
             ''
         """
-        text = re.sub(r"<[^>]+>", '', text)
-        text = "; ".join(text.split('\n'))
-        text = ' '.join(text.split())
-        return text
+        return Cleaner.clean_report(text)
 
 
 class Vacancy:
-    """Класс устанавливает все основные поля вакансии
+    """Класс устанавливает все основные поля вакансии. Хранится в __slots__, зарплата и год публикации
+    разбираются из исходных строк только при первом обращении
         Attributes:
             name (str): Название вакансии
             salary (Salary): Комбинированная информация о зарплате
             area_name (str): Название региона
             published_at (str): Дата публикации вакансии
+            year (int): Год публикации вакансии
     """
+    __slots__ = ('name', '_salary', 'area_name', 'published_at', '_year')
 
     def __init__(self, name, salary, area_name, published_at):
         """Инициализирует объект Vacancy
             Args:
             name (str): Название вакансии
-            salary (Salary): Комбинированная информация о зарплате
+            salary (Salary or tuple): Информация о зарплате или кортеж исходных строк (от, до, валюта)
             area_name (str): Название региона
             published_at (str): Дата публикации вакансии
         """
         self.name = name
-        self.salary = salary
+        self._salary = salary
         self.area_name = area_name
         self.published_at = published_at
+        self._year = None
+
+    @property
+    def salary(self):
+        if type(self._salary) is tuple:
+            self._salary = Salary(*self._salary, self.published_at)
+        return self._salary
+
+    @property
+    def year(self):
+        if self._year is None:
+            self._year = DataSet.get_year(self.published_at)
+        return self._year
 
 
 class Salary:
-    """Класс для представления зарплаты, также здесь находится словарь для перевода курсов - currency
+    """Класс для представления зарплаты, в рубли она переводится по курсу месяца публикации из CurrencyRates
         Attributes:
             salary_from (str): Нижняя граница вилки оклада
             salary_to (str): Верхняя граница вилки оклада
             salary_currency (str): Валюта оклада
-            salary_to_rub (int): Средняя зарплата в рублях
+            published_at (str or None): Дата публикации вакансии, None - постоянный курс
+            salary_to_rub (int): Средняя зарплата в рублях, вычисляется при первом обращении
     """
-    currency = {"AZN": 35.68,
-                "BYR": 23.91,
-                "EUR": 59.90,
-                "GEL": 21.74,
-                "KGS": 0.76,
-                "KZT": 0.13,
-                "RUR": 1,
-                "UAH": 1.64,
-                "USD": 60.66,
-                "UZS": 0.0055}
-
-    def __init__(self, salary_from, salary_to, salary_currency):
+    __slots__ = ('salary_from', 'salary_to', 'salary_currency', 'published_at', '_salary_to_rub')
+
+    def __init__(self, salary_from, salary_to, salary_currency, published_at=None):
         """Инициализирует объект Salary
 
             Args:
                 salary_from (str or int or float): Нижняя граница вилки оклада
                 salary_to (str or int or float): Верхняя граница вилки оклада
                 salary_currency (str): Валюта оклада
+                published_at (str or None): Дата публикации вакансии
                 salary_to_rub (int): Средняя зарплата в рублях
 
             >>> type(Salary(10.0, 20.4, 'RUR')).__name__
@@ -117,30 +143,40 @@ class Salary:
         self.salary_from = salary_from
         self.salary_to = salary_to
         self.salary_currency = salary_currency
-        self.salary_to_rub = Salary.currency_to_rub(salary_from, salary_to, salary_currency)
+        self.published_at = published_at
+        self._salary_to_rub = None
+
+    @property
+    def salary_to_rub(self):
+        if self._salary_to_rub is None:
+            self._salary_to_rub = Salary.currency_to_rub(self.salary_from, self.salary_to, self.salary_currency,
+                                                         self.published_at)
+        return self._salary_to_rub
 
     @staticmethod
-    def currency_to_rub(salary_from, salary_to, salary_currency):
-        """Вычисляет среднюю зарплату из вилки и переводит в рубли, при помощи словаря - currency
+    def currency_to_rub(salary_from, salary_to, salary_currency, published_at=None):
+        """Вычисляет среднюю зарплату из вилки и переводит в рубли по курсу месяца публикации (CurrencyRates)
 
             Args:
                 salary_from (str or int or float): Нижняя вилка оклада
                 salary_to (str or int or float): Верхняя вилка оклада
                 salary_currency (str): Валюта оклада
+                published_at (str or None): Дата публикации вакансии, None - постоянный курс
 
             Returns:
                 float: Средняя зарплата в рублях
 
-        >>> Salary(10, 20, 'RUR').currency_to_rub()
+        >>> Salary.currency_to_rub(10, 20, 'RUR')
         15.0
-        >>> Salary(10.0, 20, 'RUR').currency_to_rub()
+        >>> Salary.currency_to_rub(10.0, 20, 'RUR')
         15.0
-        >>> Salary(10, 30.0, 'RUR').currency_to_rub()
+        >>> Salary.currency_to_rub(10, 30.0, 'RUR')
         20.0
-        >>> Salary(10, 30.0, 'EUR').currency_to_rub()
+        >>> Salary.currency_to_rub(10, 30.0, 'EUR')
         1198.0
         """
-        return (float(salary_from) + float(salary_to)) / 2 * Salary.currency[salary_currency]
+        rate = CurrencyRates.get().get_rate(salary_currency, published_at)
+        return (float(salary_from) + float(salary_to)) / 2 * rate
 
 
 class DataSet:
@@ -150,16 +186,26 @@ class DataSet:
             file_name (str): Название файла
             vacancies_objects (list): Список вакансий
     """
+    columns = ('name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at')
 
-    def __init__(self, file_name):
-        """Инициализирует объект DataSet
+    def __init__(self, file_name, stream=False, columns=None, cache=False, years=None, areas=None):
+        """Инициализирует объект DataSet. Файлы .parquet, .feather и .arrow из "Splitting into chunks.py"
+        читаются напрямую через ColumnarStore
 
             Args:
                 file_name (str): Название файла
-                vacancies_objects (list): Список вакансий
+                stream (bool): Читать ли вакансии лениво, по одной строке за раз
+                columns (tuple or None): Колонки, которые нужно очистить, по умолчанию - DataSet.columns
+                cache (bool): Брать ли очищенные колонки из кэша DatasetCache (не используется при stream)
+                years (iterable or None): Нужные годы публикации, None - все годы
+                areas (iterable or None): Нужные регионы, None - все регионы
+                vacancies_objects (list or generator): Список вакансий
         """
         self.file_name = file_name
-        self.vacancies_objects = DataSet.prepare_data(file_name)
+        if stream:
+            self.vacancies_objects = DataSet.iter_vacancies(file_name, columns, years, areas)
+        else:
+            self.vacancies_objects = DataSet.prepare_data(file_name, columns, cache, years, areas)
 
     @staticmethod
     def clear_csv(str_value):
@@ -194,6 +240,30 @@ class DataSet:
     def get_year(date):
         return int(date[:4])
 
+    @staticmethod
+    def get_chunk_files(directory):
+        """Возвращает файлы частей из папки: перечисленные в manifest.json в порядке ключей частей, а если
+        manifest.json нет - файлы part_{year}.csv в порядке возрастания года
+            Args:
+                directory (str): Папка с файлами частей
+            Returns:
+                list: Пути к файлам
+        """
+        manifest = os.path.join(directory, 'manifest.json')
+        if os.path.exists(manifest):
+            with open(manifest, encoding='utf-8') as file:
+                shards = json.load(file)['shards']
+            if not shards:
+                print("Нет данных")
+                exit()
+            return [os.path.join(directory, shard['file']) for shard in shards]
+        files = [name for name in os.listdir(directory) if re.fullmatch(r'part_\d+\.csv', name)]
+        if not files:
+            print("Нет данных")
+            exit()
+        files.sort(key=lambda name: int(name[5:-4]))
+        return [os.path.join(directory, name) for name in files]
+
 
     # @staticmethod
     # def str_cut_with_split_method(dic_vacancies):
@@ -204,31 +274,293 @@ class DataSet:
 
 
     @staticmethod
-    def prepare_data(file_name):
+    def iter_rows(file_name, columns=None):
+        """Построчно читает csv файл, отбирает строки без пустых ячеек и по одной возвращает их.
+        В памяти одновременно находится только одна строка файла, очищаются только нужные колонки
+            Args:
+                file_name (str): Название файла
+                columns (tuple or None): Колонки, которые нужно очистить, по умолчанию - DataSet.columns
+            Yields:
+                dict: Очищенные значения нужных колонок
+        """
+        with open(file_name, encoding="utf-8-sig") as file_csv:
+            reader = csv.reader(file_csv)
+            heads = next(reader, None)
+            if heads is None:
+                print("Пустой файл")
+                exit()
+            clean_row = Cleaner.get_row_cleaner(heads, columns or DataSet.columns, Cleaner.clean_report)
+            for line in reader:
+                if len(line) != len(heads) or "" in line:
+                    continue
+                yield clean_row(line)
+
+    @staticmethod
+    def iter_mapped_rows(file_name, columns=None, start=None, end=None):
+        """Читает строки csv файла через mmap: декодируются и очищаются только нужные колонки.
+        Можно прочитать только диапазон байтов, полученный из MappedCsv.split
+            Args:
+                file_name (str): Название файла
+                columns (tuple or None): Нужные колонки, по умолчанию - DataSet.columns
+                start (int or None): Начало диапазона байтов
+                end (int or None): Конец диапазона байтов
+            Yields:
+                dict: Очищенные значения нужных колонок
+        """
+        with MappedCsv(file_name) as mapped:
+            if not mapped.heads:
+                print("Пустой файл")
+                exit()
+            columns = [column for column in mapped.heads if column in (columns or DataSet.columns)]
+            indexes = [mapped.heads.index(column) for column in columns]
+            for values in mapped.iter_rows(indexes, start, end):
+                yield dict(zip(columns, map(Cleaner.clean_report, values)))
+
+    @staticmethod
+    def iter_vacancies(file_name, columns=None, years=None, areas=None):
+        """Построчно читает csv файл, отбирает вакансии без пустых ячеек и по одной возвращает их.
+        Колоночный файл читается целиком через load_columnar
+            Args:
+                file_name (str): Название файла
+                columns (tuple or None): Колонки, которые нужно очистить, по умолчанию - DataSet.columns
+                years (iterable or None): Нужные годы публикации, None - все годы
+                areas (iterable or None): Нужные регионы, None - все регионы
+            Yields:
+                Vacancy: Очередная вакансия
+        """
+        if ColumnarStore.is_columnar(file_name):
+            yield from DataSet.prepare_data(file_name, columns, years=years, areas=areas)
+            return
+        years = None if years is None else {int(year) for year in years}
+        areas = None if areas is None else set(areas)
+        for dic in DataSet.iter_rows(file_name, columns):
+            vacancy = Vacancy(dic["name"],
+                              (dic["salary_from"], dic["salary_to"], dic["salary_currency"]),
+                              dic["area_name"],
+                              dic["published_at"])
+            if (years is None or vacancy.year in years) and (areas is None or vacancy.area_name in areas):
+                yield vacancy
+
+    @staticmethod
+    def load_columnar(file_name, columns=None, years=None, areas=None):
+        """Читает нужные колонки файла .parquet, .feather или .arrow, созданного "Splitting into chunks.py".
+        Читаются только нужные колонки, строки отбираются по году и региону при чтении, а текст словарных
+        колонок (регион, валюта) дочищается Cleaner.clean_report один раз на значение словаря
+            Args:
+                file_name (str): Название файла
+                columns (tuple or None): Нужные колонки, по умолчанию - DataSet.columns
+                years (iterable or None): Нужные годы публикации, None - все годы
+                areas (iterable or None): Нужные регионы, None - все регионы
+            Returns:
+                dict: Название колонки -> список значений
+        """
+        return ColumnarStore.read(file_name, columns or DataSet.columns, years, areas, Cleaner.clean_report)
+
+    @staticmethod
+    def load_columns(file_name, columns=None):
+        """Возвращает очищенные колонки файла из кэша, а если их там нет - читает файл и сохраняет их в кэш
+            Args:
+                file_name (str): Название файла
+                columns (tuple or None): Колонки, которые нужно очистить, по умолчанию - DataSet.columns
+            Returns:
+                dict: Название колонки -> список значений
+        """
+        columns = columns or DataSet.columns
+        tag = 'report_out.DataSet:' + ','.join(columns)
+        data = DatasetCache.load(file_name, tag)
+        if data is None:
+            rows = list(DataSet.iter_rows(file_name, columns))
+            data = {column: [row[column] for row in rows] for column in columns}
+            DatasetCache.save(file_name, tag, data)
+        return data
+
+    @staticmethod
+    def prepare_data(file_name, columns=None, cache=False, years=None, areas=None):
         """Отбирает вакансии без пустых ячеек и составляет лист вакансий
             Args:
                 file_name (str): Название файла
+                columns (tuple or None): Колонки, которые нужно очистить, по умолчанию - DataSet.columns
+                cache (bool): Брать ли очищенные колонки из кэша DatasetCache
+                years (iterable or None): Нужные годы публикации, None - все годы
+                areas (iterable or None): Нужные регионы, None - все регионы
             Returns:
                 list: Лист, состоящий из вакансий
         """
-        heads, data = DataSet.reader_csv(file_name)
-        processed = [x for x in data if len(x) == len(heads) and "" not in x]
-        vacancy_data = []
-        for line in processed:
-            dic = {}
-            salary = []
-            for i, item in enumerate(line):
-                item = Tools.prepare(item)
-                dic[heads[i]] = item
-                if heads[i] in ['salary_from', 'salary_to', 'salary_currency']:
-                    salary.append(Tools.prepare(item))
-                    if len(salary) == 3:
-                        dic["salary"] = Salary(salary[0], salary[1], salary[2])
-            vacancy_data.append(Vacancy(dic["name"],
-                                        dic["salary"],
-                                        dic["area_name"],
-                                        dic["published_at"]))
-        return vacancy_data
+        if ColumnarStore.is_columnar(file_name):
+            data = DataSet.load_columnar(file_name, columns, years, areas)
+        elif not cache or years is not None or areas is not None:
+            return list(DataSet.iter_vacancies(file_name, columns, years, areas))
+        else:
+            data = DataSet.load_columns(file_name, columns)
+        return [Vacancy(*values) for values in zip(data["name"],
+                                                   zip(data["salary_from"], data["salary_to"], data["salary_currency"]),
+                                                   data["area_name"],
+                                                   data["published_at"])]
+
+
+class ColumnarDataSet:
+    """Класс хранит вакансии по колонкам в массивах NumPy и считает статистику векторно, без объектов Vacancy.
+    Строковые колонки хранятся как коды категорий, значения категорий - в отдельных списках
+
+        Attributes:
+            file_name (str): Название файла
+            names (list): Различные названия вакансий
+            name_codes (np.ndarray): Коды названий вакансий (int32)
+            salary_from (np.ndarray): Нижние границы вилки оклада (float64)
+            salary_to (np.ndarray): Верхние границы вилки оклада (float64)
+            currencies (list): Различные валюты оклада
+            currency_codes (np.ndarray): Коды валют (int32)
+            areas (list): Различные названия регионов в порядке первого появления
+            area_codes (np.ndarray): Коды регионов (int32)
+            years (np.ndarray): Годы публикации (int16)
+            months (np.ndarray): Месяцы публикации (int8)
+    """
+    fields = ('names', 'name_codes', 'salary_from', 'salary_to', 'currencies', 'currency_codes', 'areas',
+              'area_codes', 'years', 'months')
+    cache_tag = 'report_out.ColumnarDataSet:months'
+
+    def __init__(self, file_name, cache=False):
+        """Инициализирует объект ColumnarDataSet, читая csv файл за один проход, колоночный файл - через
+        ColumnarStore, или загружая колонки из кэша
+
+            Args:
+                file_name (str): Название файла .csv, .parquet, .feather или .arrow
+                cache (bool): Использовать ли кэш DatasetCache
+        """
+        self.file_name = file_name
+        data = DatasetCache.load(file_name, ColumnarDataSet.cache_tag) if cache else None
+        if data is not None:
+            for field in ColumnarDataSet.fields:
+                setattr(self, field, data[field])
+            return
+        if ColumnarStore.is_columnar(file_name):
+            self.read_columnar(file_name)
+        else:
+            self.read_csv(file_name)
+        if cache:
+            DatasetCache.save(file_name, ColumnarDataSet.cache_tag,
+                              {field: getattr(self, field) for field in ColumnarDataSet.fields})
+
+    def read_csv(self, file_name):
+        """Заполняет колонки, читая csv файл за один проход
+
+            Args:
+                file_name (str): Название файла
+        """
+        names, currencies, areas = {}, {}, {}
+        name_codes, currency_codes, area_codes = array('i'), array('i'), array('i')
+        salary_from, salary_to, years, months = array('d'), array('d'), array('h'), array('b')
+        for dic in DataSet.iter_rows(file_name):
+            name_codes.append(names.setdefault(dic["name"], len(names)))
+            salary_from.append(float(dic["salary_from"]))
+            salary_to.append(float(dic["salary_to"]))
+            currency_codes.append(currencies.setdefault(dic["salary_currency"], len(currencies)))
+            area_codes.append(areas.setdefault(dic["area_name"], len(areas)))
+            years.append(DataSet.get_year(dic["published_at"]))
+            months.append(int(dic["published_at"][5:7]))
+        self.names = list(names)
+        self.name_codes = np.frombuffer(name_codes, dtype=np.int32)
+        self.salary_from = np.frombuffer(salary_from, dtype=np.float64)
+        self.salary_to = np.frombuffer(salary_to, dtype=np.float64)
+        self.currencies = list(currencies)
+        self.currency_codes = np.frombuffer(currency_codes, dtype=np.int32)
+        self.areas = list(areas)
+        self.area_codes = np.frombuffer(area_codes, dtype=np.int32)
+        self.years = np.frombuffer(years, dtype=np.int16)
+        self.months = np.frombuffer(months, dtype=np.int8)
+
+    def read_columnar(self, file_name):
+        """Заполняет колонки по колоночному файлу, созданному "Splitting into chunks.py": значения читаются
+        сразу по колонкам, без разбора строк csv
+
+            Args:
+                file_name (str): Название файла .parquet, .feather или .arrow
+        """
+        data = DataSet.load_columnar(file_name)
+        self.names, self.name_codes = ColumnarDataSet.get_codes(data["name"])
+        self.salary_from = np.array(data["salary_from"], dtype=np.float64)
+        self.salary_to = np.array(data["salary_to"], dtype=np.float64)
+        self.currencies, self.currency_codes = ColumnarDataSet.get_codes(data["salary_currency"])
+        self.areas, self.area_codes = ColumnarDataSet.get_codes(data["area_name"])
+        self.years = np.array([DataSet.get_year(date) for date in data["published_at"]], dtype=np.int16)
+        self.months = np.array([int(date[5:7]) for date in data["published_at"]], dtype=np.int8)
+
+    @staticmethod
+    def get_codes(values):
+        """Кодирует значения колонки номерами в порядке первого появления
+
+            Args:
+                values (list): Значения
+
+            Returns:
+                tuple: Различные значения и их коды (np.ndarray, int32)
+
+            >>> ColumnarDataSet.get_codes(['Москва', 'Казань', 'Москва'])
+            (['Москва', 'Казань'], array([0, 1, 0], dtype=int32))
+        """
+        labels = {}
+        codes = np.array([labels.setdefault(value, len(labels)) for value in values], dtype=np.int32)
+        return list(labels), codes
+
+    def get_salaries_to_rub(self):
+        """Вычисляет средние зарплаты в рублях для всех вакансий одной векторной операцией: курсы
+        CurrencyRates берутся из таблицы валюта - месяц по кодам валют и месяцев
+
+            Returns:
+                np.ndarray: Средние зарплаты в рублях
+        """
+        month_keys, month_codes = np.unique(self.years.astype(np.int32) * 100 + self.months, return_inverse=True)
+        months = [f'{key // 100:04d}-{key % 100:02d}' for key in month_keys.tolist()]
+        rates = CurrencyRates.get().get_table(self.currencies, months)
+        return (self.salary_from + self.salary_to) / 2 * rates[self.currency_codes, month_codes]
+
+    @staticmethod
+    def group(codes, salaries, labels):
+        """Группирует зарплаты по кодам: количества считаются через np.bincount, суммы - точно (math.fsum)
+        по отрезкам отсортированного массива, поэтому совпадают с суммами StatsAccumulator
+
+            Args:
+                codes (np.ndarray): Коды групп, от 0 до len(labels) - 1
+                salaries (np.ndarray): Зарплаты в рублях
+                labels (list or range): Значения групп по кодам
+
+            Returns:
+                dict: Группа -> [частичные суммы зарплат, количество вакансий] в порядке кодов
+        """
+        counts = np.bincount(codes, minlength=len(labels))
+        ordered = salaries[np.argsort(codes, kind='stable')].tolist()
+        result = {}
+        start = 0
+        for label, count in zip(labels, counts.tolist()):
+            if count:
+                result[label] = [[math.fsum(ordered[start:start + count])], count]
+            start += count
+        return result
+
+    def get_stats(self, key):
+        """Считает статистику для профессии key без обхода вакансий в Python
+
+            Args:
+                key (str): Название профессии
+
+            Returns:
+                StatsAccumulator: Статистика, совпадающая с результатом построчного подсчета
+        """
+        stats = StatsAccumulator(key)
+        stats.total = len(self.years)
+        if stats.total == 0:
+            return stats
+        salaries = self.get_salaries_to_rub()
+        first_year = int(self.years.min())
+        year_labels = range(first_year, int(self.years.max()) + 1)
+        year_codes = self.years.astype(np.intp) - first_year
+        stats.years = ColumnarDataSet.group(year_codes, salaries, year_labels)
+        key_names = np.array([key in name for name in self.names], dtype=bool)
+        mask = key_names[self.name_codes]
+        stats.key_years = ColumnarDataSet.group(year_codes[mask], salaries[mask], year_labels)
+        stats.cities = ColumnarDataSet.group(self.area_codes, salaries, self.areas)
+        stats.key_cities = ColumnarDataSet.group(self.area_codes[mask], salaries[mask], self.areas)
+        return stats
 
 
 class InputParam:
@@ -261,72 +593,407 @@ class InputParam:
     @staticmethod
     def print_data(dictionary, key):
         """Печатает статистику и вызывает методы для формирования графиков и отчетов
+            Все показатели считаются за один проход по вакансиям, поэтому dictionary может быть генератором
             Args:
-                dictionary (list): Список вакансий
+                dictionary (iterable): Вакансии
                 key (str): Название профессии
         """
-        years = []
-        for vacancy in dictionary:
-            years.append(InputParam.get_params(vacancy.published_at))
-        Year = years
-        years = list(range(min(years), max(years) + 1))
-
-        salary_filter = {year: [] for year in years}
-        vac_filter = {year: 0 for year in years}
-        vac_sal_filter = {year: [] for year in years}
-        vac_count_filter = {year: 0 for year in years}
-
-        for i, vacancy in enumerate(dictionary):
-            year = Year[i]
-            salary_filter[year].append(vacancy.salary.salary_to_rub)
-            vac_filter[year] += 1
-            if key in vacancy.name:
-                vac_sal_filter[year].append(vacancy.salary.salary_to_rub)
-                vac_count_filter[year] += 1
-
-        salary_filter = {key: int(sum(value) / len(value)) if len(value) != 0 else 0 for key, value in
-                         salary_filter.items()}
-        vac_sal_filter = {key: int(sum(value) / len(value)) if len(value) != 0 else 0 for key, value in
-                          vac_sal_filter.items()}
-
-        dic = {}
-        for vacancy in dictionary:
-            if vacancy.area_name in dic:
-                dic[vacancy.area_name].append(vacancy.salary.salary_to_rub)
-            else:
-                dic[vacancy.area_name] = [vacancy.salary.salary_to_rub]
-
-        area_filter = dic.items()
-        area_filter = [x for x in area_filter if len(x[1]) / len(dictionary) > 0.01]
-        area_filter.sort(key=lambda item: sum(item[1]) / len(item[1]), reverse=True)
-        salary_cities_filter = {item[0]: int(sum(item[1]) / len(item[1])) for item in
-                                area_filter[0: min(len(area_filter), 10)]}
-
-        vacs_dic = {}
-        for vacancy in dictionary:
-            if vacancy.area_name in vacs_dic:
-                vacs_dic[vacancy.area_name] += 1
+        stats = StatsAccumulator(key).add_all(dictionary)
+        InputParam.print_report(stats.get_report())
+
+    @staticmethod
+    def print_report(report, directory=None, render_graph=True):
+        """Печатает статистику из отчета и вызывает методы для формирования графиков и отчетов
+            Args:
+                report (Report): Объект класса Report
+                directory (str or None): Папка для файлов отчета, по умолчанию - Report.get_directory
+                render_graph (bool): Строить ли графики, False - если изображение уже построено
+        """
+        print('Динамика уровня зарплат по годам:', report.salary_filter)
+        print('Динамика количества вакансий по годам:', report.vac_filter)
+        print('Динамика уровня зарплат по годам для выбранной профессии:', report.vac_sal_filter)
+        print('Динамика количества вакансий по годам для выбранной профессии:', report.vac_count_filter)
+        print('Уровень зарплат по городам (в порядке убывания):', report.salary_cities_filter)
+        print('Доля вакансий по городам (в порядке убывания):', report.vacs_cities)
+
+        Report.generate_all(report, directory or Report.get_directory(report.vacancy), render_graph)
+
+
+class StatsAccumulator:
+    """Класс накапливает статистику по вакансиям за один проход: суммы зарплат и количества вакансий по годам
+    и по городам, в целом и для выбранной профессии. Занимает O(годы + города) памяти, а не O(вакансии).
+    Состояние можно сохранить в файл и позже дополнить новыми вакансиями, не пересчитывая старые.
+    В состоянии хранятся отпечатки добавленных файлов, поэтому повторно добавленный файл не учитывается дважды
+        Attributes:
+            key (str): Название профессии
+            years (dict): Год -> [частичные суммы зарплат, количество вакансий]
+            key_years (dict): Год -> [частичные суммы зарплат, количество вакансий] для выбранной профессии
+            cities (dict): Город -> [частичные суммы зарплат, количество вакансий]
+            key_cities (dict): Город -> [частичные суммы зарплат, количество вакансий] для выбранной профессии
+            total (int): Общее количество вакансий
+            batches (list): Отпечатки (SHA-256 содержимого) добавленных через update файлов
+    """
+    fields = ('years', 'key_years', 'cities', 'key_cities')
+
+    def __init__(self, key):
+        """Инициализирует пустой объект StatsAccumulator
+            Args:
+                key (str): Название профессии
+        """
+        self.key = key
+        self.years = {}
+        self.key_years = {}
+        self.cities = {}
+        self.key_cities = {}
+        self.total = 0
+        self.batches = []
+
+    @staticmethod
+    def add_exact(partials, value):
+        """Прибавляет value к сумме, хранящейся в виде списка неперекрывающихся частичных сумм (алгоритм Шевчука).
+        Такая сумма не зависит от порядка сложения, поэтому статистика частей данных объединяется без погрешности
+            Args:
+                partials (list): Частичные суммы, изменяются на месте
+                value (float): Слагаемое
+
+            >>> partials = []
+            >>> for value in [0.1] * 10: StatsAccumulator.add_exact(partials, value)
+            >>> math.fsum(partials)
+            1.0
+        """
+        i = 0
+        for partial in partials:
+            if abs(value) < abs(partial):
+                value, partial = partial, value
+            high = value + partial
+            low = partial - (high - value)
+            if low:
+                partials[i] = low
+                i += 1
+            value = high
+        partials[i:] = [value]
+
+    @staticmethod
+    def add_value(dictionary, name, salary):
+        """Добавляет зарплату к сумме и счетчику по ключу name
+            Args:
+                dictionary (dict): Ключ -> [частичные суммы зарплат, количество вакансий]
+                name (int or str): Год или город
+                salary (float): Зарплата в рублях
+        """
+        entry = dictionary.get(name)
+        if entry is None:
+            dictionary[name] = [[salary], 1]
+        else:
+            StatsAccumulator.add_exact(entry[0], salary)
+            entry[1] += 1
+
+    def add(self, vacancy):
+        """Учитывает одну вакансию
+            Args:
+                vacancy (Vacancy): Вакансия
+        """
+        year = vacancy.year
+        salary = vacancy.salary.salary_to_rub
+        StatsAccumulator.add_value(self.years, year, salary)
+        StatsAccumulator.add_value(self.cities, vacancy.area_name, salary)
+        if self.key in vacancy.name:
+            StatsAccumulator.add_value(self.key_years, year, salary)
+            StatsAccumulator.add_value(self.key_cities, vacancy.area_name, salary)
+        self.total += 1
+
+    @staticmethod
+    def from_file(file_name, key):
+        """Считает статистику по одному csv файлу. Используется как задача для процессов-обработчиков
+            Args:
+                file_name (str): Название файла
+                key (str): Название профессии
+            Returns:
+                StatsAccumulator: Статистика по файлу
+        """
+        return StatsAccumulator(key).add_all(DataSet.iter_vacancies(file_name))
+
+    @staticmethod
+    def from_chunks(directory, key, max_workers=None):
+        """Параллельно считает статистику по файлам частей из папки, созданной "Splitting into chunks.py".
+        Каждый файл обрабатывается в отдельном процессе. Большие файлы отдаются процессам первыми, чтобы
+        процессы были загружены равномерно, а результаты объединяются в порядке частей
+            Args:
+                directory (str): Папка с файлами частей
+                key (str): Название профессии
+                max_workers (int or None): Количество процессов, по умолчанию - количество ядер
+            Returns:
+                StatsAccumulator: Статистика по всем файлам
+        """
+        files = DataSet.get_chunk_files(directory)
+        stats = StatsAccumulator(key)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {file_name: executor.submit(StatsAccumulator.from_file, file_name, key)
+                       for file_name in sorted(files, key=os.path.getsize, reverse=True)}
+            for file_name in files:
+                stats.merge(futures[file_name].result())
+        return stats
+
+    @staticmethod
+    def from_range(file_name, key, start, end):
+        """Считает статистику по диапазону байтов csv файла, прочитанному через mmap.
+        Используется как задача для процессов-обработчиков
+            Args:
+                file_name (str): Название файла
+                key (str): Название профессии
+                start (int): Начало диапазона байтов
+                end (int): Конец диапазона байтов
+            Returns:
+                StatsAccumulator: Статистика по диапазону
+        """
+        stats = StatsAccumulator(key)
+        for dic in DataSet.iter_mapped_rows(file_name, start=start, end=end):
+            stats.add(Vacancy(dic["name"],
+                              (dic["salary_from"], dic["salary_to"], dic["salary_currency"]),
+                              dic["area_name"],
+                              dic["published_at"]))
+        return stats
+
+    @staticmethod
+    def from_mapped(file_name, key, max_workers=None):
+        """Параллельно считает статистику по одному большому csv файлу: файл отображается в память,
+        делится на диапазоны байтов по границам строк, и каждый диапазон обрабатывается в отдельном процессе
+            Args:
+                file_name (str): Название файла
+                key (str): Название профессии
+                max_workers (int or None): Количество процессов, по умолчанию - количество ядер
+            Returns:
+                StatsAccumulator: Статистика по всему файлу
+        """
+        with MappedCsv(file_name) as mapped:
+            ranges = mapped.split(max_workers or os.cpu_count() or 1)
+        stats = StatsAccumulator(key)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            starts, ends = zip(*ranges)
+            for part in executor.map(StatsAccumulator.from_range, repeat(file_name), repeat(key), starts, ends):
+                stats.merge(part)
+        return stats
+
+    def add_all(self, vacancies):
+        """Учитывает все вакансии из итерируемого объекта
+            Args:
+                vacancies (iterable): Вакансии
+            Returns:
+                StatsAccumulator: self
+        """
+        for vacancy in vacancies:
+            self.add(vacancy)
+        return self
+
+    @staticmethod
+    def merge_dict(dictionary, other):
+        """Прибавляет суммы и счетчики словаря other к словарю dictionary
+            Args:
+                dictionary (dict): Ключ -> [частичные суммы зарплат, количество вакансий]
+                other (dict): Ключ -> [частичные суммы зарплат, количество вакансий]
+        """
+        for name, (partials, count) in other.items():
+            entry = dictionary.get(name)
+            if entry is None:
+                dictionary[name] = [list(partials), count]
             else:
-                vacs_dic[vacancy.area_name] = 1
+                for partial in partials:
+                    StatsAccumulator.add_exact(entry[0], partial)
+                entry[1] += count
+
+    def merge(self, other):
+        """Объединяет накопленную статистику с другим объектом StatsAccumulator той же профессии
+            Args:
+                other (StatsAccumulator): Статистика другой части данных
+            Returns:
+                StatsAccumulator: self
+        """
+        for field in StatsAccumulator.fields:
+            StatsAccumulator.merge_dict(getattr(self, field), getattr(other, field))
+        self.total += other.total
+        self.batches.extend(batch for batch in other.batches if batch not in self.batches)
+        return self
+
+    def save(self, file_name):
+        """Сохраняет накопленную статистику в json файл. Частичные суммы сохраняются без потери точности
+            Args:
+                file_name (str): Название файла состояния
+        """
+        state = {'key': self.key, 'total': self.total, 'batches': self.batches}
+        for field in StatsAccumulator.fields:
+            state[field] = [[name, partials, count] for name, (partials, count) in getattr(self, field).items()]
+        temp_name = file_name + '.tmp'
+        with open(temp_name, 'w', encoding='utf-8') as file:
+            json.dump(state, file, ensure_ascii=False)
+        os.replace(temp_name, file_name)
+
+    @staticmethod
+    def load(file_name):
+        """Загружает статистику, сохраненную методом save
+            Args:
+                file_name (str): Название файла состояния
+            Returns:
+                StatsAccumulator: Накопленная статистика
+        """
+        with open(file_name, encoding='utf-8') as file:
+            state = json.load(file)
+        stats = StatsAccumulator(state['key'])
+        stats.total = state['total']
+        stats.batches = state.get('batches', [])
+        for field in StatsAccumulator.fields:
+            setattr(stats, field, {name: [partials, count] for name, partials, count in state[field]})
+        return stats
+
+    @staticmethod
+    def get_fingerprint(file_name):
+        """Вычисляет отпечаток файла - SHA-256 его содержимого. Отпечаток не зависит от пути и времени изменения,
+        поэтому повторно скачанный или скопированный файл с теми же данными узнается
+            Args:
+                file_name (str): Название файла
+            Returns:
+                str: Шестнадцатеричный отпечаток
+        """
+        digest = hashlib.sha256()
+        with open(file_name, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
 
-        count = {x: round(y / len(dictionary), 4) for x, y in vacs_dic.items()}
+    @staticmethod
+    def update(state_file, file_name, key):
+        """Дополняет сохраненную статистику вакансиями из нового csv файла и сохраняет ее.
+        Время работы зависит только от размера нового файла. Файл, отпечаток которого уже есть в состоянии
+        (например, при повторном запуске той же выгрузки), пропускается, а состояние не меняется
+            Args:
+                state_file (str): Название файла состояния, если его нет - статистика считается с нуля
+                file_name (str): Название csv файла с новыми вакансиями
+                key (str): Название профессии
+            Returns:
+                StatsAccumulator: Обновленная статистика
+        """
+        stats = StatsAccumulator(key)
+        if os.path.exists(state_file):
+            stats = StatsAccumulator.load(state_file)
+            if stats.key != key:
+                print("Файл состояния посчитан для другой профессии")
+                exit()
+        fingerprint = StatsAccumulator.get_fingerprint(file_name)
+        if fingerprint in stats.batches:
+            print("Файл уже добавлен в статистику")
+            return stats
+        stats.add_all(DataSet.iter_vacancies(file_name))
+        stats.batches.append(fingerprint)
+        stats.save(state_file)
+        return stats
+
+    @staticmethod
+    def get_averages(dictionary, years):
+        """Вычисляет средние зарплаты и количества вакансий по годам, для годов без вакансий - 0
+            Args:
+                dictionary (dict): Год -> [частичные суммы зарплат, количество вакансий]
+                years (range): Годы
+            Returns:
+                Tuple (dict, dict): Средние зарплаты и количества вакансий по годам
+        """
+        salaries = {year: int(math.fsum(dictionary[year][0]) / dictionary[year][1]) if year in dictionary else 0
+                    for year in years}
+        counts = {year: dictionary[year][1] if year in dictionary else 0 for year in years}
+        return salaries, counts
+
+    def get_report(self):
+        """Формирует итоговые словари статистики. Города с равными долями или средними зарплатами
+        упорядочиваются по названию, поэтому порядок не зависит от порядка строк в файле и частях
+            Returns:
+                Report: Объект класса Report
+        """
+        if self.total == 0:
+            print("Нет данных")
+            exit()
+
+        years = range(min(self.years), max(self.years) + 1)
+        salary_filter, vac_filter = StatsAccumulator.get_averages(self.years, years)
+        vac_sal_filter, vac_count_filter = StatsAccumulator.get_averages(self.key_years, years)
+
+        area_filter = [(area, math.fsum(partials) / count) for area, (partials, count) in self.cities.items()
+                       if count / self.total > 0.01]
+        area_filter.sort(key=lambda item: (-item[1], item[0]))
+        salary_cities_filter = {item[0]: int(item[1]) for item in area_filter[0: min(len(area_filter), 10)]}
+
+        count = {x: round(y[1] / self.total, 4) for x, y in self.cities.items()}
         count = {x: val for x, val in count.items() if val >= 0.01}
-        vacs_cities = dict(sorted(count.items(), key=lambda item: item[1], reverse=True))
+        vacs_cities = dict(sorted(count.items(), key=lambda item: (-item[1], item[0])))
         others = sum(dict(list(vacs_cities.items())[11:]).values())
         vacs_cities = dict(list(vacs_cities.items())[:10])
 
-        print('Динамика уровня зарплат по годам:', salary_filter)
-        print('Динамика количества вакансий по годам:', vac_filter)
-        print('Динамика уровня зарплат по годам для выбранной профессии:', vac_sal_filter)
-        print('Динамика количества вакансий по годам для выбранной профессии:', vac_count_filter)
-        print('Уровень зарплат по городам (в порядке убывания):', salary_cities_filter)
-        print('Доля вакансий по городам (в порядке убывания):', vacs_cities)
+        return Report(salary_filter, vac_filter, vac_sal_filter, vac_count_filter, salary_cities_filter,
+                      vacs_cities, others, self.key)
+
+
+class BatchStatsAccumulator:
+    """Класс накапливает статистику сразу для списка профессий за один проход по вакансиям. Общие показатели
+    по годам и городам считаются один раз, а профессии, входящие в название вакансии, находит ProfessionMatcher
+        Attributes:
+            keys (list): Названия профессий
+            years (dict): Год -> [частичные суммы зарплат, количество вакансий]
+            cities (dict): Город -> [частичные суммы зарплат, количество вакансий]
+            key_years (list): Для каждой профессии - словарь год -> [частичные суммы зарплат, количество вакансий]
+            key_cities (list): Для каждой профессии - словарь город -> [частичные суммы зарплат, количество вакансий]
+            total (int): Общее количество вакансий
+    """
+
+    def __init__(self, keys):
+        """Инициализирует пустой объект BatchStatsAccumulator
+            Args:
+                keys (list): Названия профессий
+        """
+        self.keys = list(keys)
+        self.matcher = ProfessionMatcher(self.keys)
+        self.years = {}
+        self.cities = {}
+        self.key_years = [{} for _ in self.keys]
+        self.key_cities = [{} for _ in self.keys]
+        self.total = 0
+
+    def add(self, vacancy):
+        """Учитывает одну вакансию для всех профессий
+            Args:
+                vacancy (Vacancy): Вакансия
+        """
+        year = vacancy.year
+        salary = vacancy.salary.salary_to_rub
+        StatsAccumulator.add_value(self.years, year, salary)
+        StatsAccumulator.add_value(self.cities, vacancy.area_name, salary)
+        for index in self.matcher.find(vacancy.name):
+            StatsAccumulator.add_value(self.key_years[index], year, salary)
+            StatsAccumulator.add_value(self.key_cities[index], vacancy.area_name, salary)
+        self.total += 1
+
+    def add_all(self, vacancies):
+        """Учитывает все вакансии из итерируемого объекта
+            Args:
+                vacancies (iterable): Вакансии
+            Returns:
+                BatchStatsAccumulator: self
+        """
+        for vacancy in vacancies:
+            self.add(vacancy)
+        return self
 
-        report = Report(salary_filter, vac_filter, vac_sal_filter, vac_count_filter, salary_cities_filter,
-                        vacs_cities, others, key)
-        Report.generate_excel(report)
-        Report.generate_graph(report)
-        Report.generate_pdf(report)
+    def get_stats(self, key):
+        """Возвращает статистику одной профессии. Общие словари не копируются
+            Args:
+                key (str): Название профессии из keys
+            Returns:
+                StatsAccumulator: Статистика профессии
+        """
+        index = self.keys.index(key)
+        stats = StatsAccumulator(key)
+        stats.years = self.years
+        stats.cities = self.cities
+        stats.key_years = self.key_years[index]
+        stats.key_cities = self.key_cities[index]
+        stats.total = self.total
+        return stats
 
 
 class Report:
@@ -390,87 +1057,278 @@ class Report:
         return str(value)
 
     @staticmethod
-    def generate_excel(report):
+    def generate_excel(report, file_name='report.xlsx'):
         """Генерирует excel файл с вакансиями
             Args:
                 report (Report): Объект класса Report
+                file_name (str): Путь к excel файлу
         """
-        wb = Workbook()
-        sheet1 = wb.active
-        sheet1.title = 'Статистика по годам'
+        wb = Workbook(write_only=True)
+        heads1 = ['Год', 'Средняя зарплата', f'Средняя зарплата - {report.vacancy}', 'Количество вакансий',
+                  f'Количество вакансий - {report.vacancy}']
+        rows1 = [heads1]
+        for year, value in report.salary_filter.items():
+            rows1.append([year, value, report.vac_sal_filter[year], report.vac_filter[year],
+                          report.vac_count_filter[year]])
+        Report.write_sheet(wb, 'Статистика по годам', rows1)
+
+        heads2 = ['Город', 'Уровень зарплат', None, 'Город', 'Доля вакансий']
+        salary_cities = list(report.salary_cities_filter.items())[:10]
+        vacs_cities = list(report.vacs_cities.items())[:10]
+        rows2 = [heads2]
+        for i in range(max(len(salary_cities), len(vacs_cities))):
+            row = list(salary_cities[i]) if i < len(salary_cities) else [None, None]
+            row.append(None)
+            if i < len(vacs_cities):
+                row += list(vacs_cities[i])
+            rows2.append(row)
+        Report.write_sheet(wb, 'Статистика по городам', rows2, percent_column=4)
+
+        wb.save(file_name)
+
+    @staticmethod
+    def write_sheet(wb, title, rows, percent_column=None):
+        """Добавляет лист в книгу, открытую в режиме write_only. Ширина колонок считается по данным за тот же проход,
+        в котором создаются ячейки, а объекты стилей общие для всех ячеек. Пустые (None) ячейки не получают рамку
+            Args:
+                wb (Workbook): Книга в режиме write_only
+                title (str): Название листа
+                rows (list): Строки листа, первая строка - заголовки (жирным шрифтом)
+                percent_column (int or None): Номер колонки (с 0) с процентным форматом
+        """
+        sheet = wb.create_sheet(title)
+        bold = Font(bold=True)
+        thin = Side(border_style='thin', color='000000')
+        border = Border(left=thin, top=thin, right=thin, bottom=thin)
+        widths = []
+        lines = []
+        for index, row in enumerate(rows):
+            line = []
+            for column, value in enumerate(row):
+                if column == len(widths):
+                    widths.append(0)
+                widths[column] = max(widths[column], len(Report.as_text(value)))
+                if value is None:
+                    line.append(None)
+                    continue
+                cell = WriteOnlyCell(sheet, value)
+                cell.border = border
+                if index == 0:
+                    cell.font = bold
+                elif column == percent_column:
+                    cell.number_format = FORMAT_PERCENTAGE_00
+                line.append(cell)
+            lines.append(line)
+        for column, width in enumerate(widths):
+            sheet.column_dimensions[get_column_letter(column + 1)].width = width + 2
+        for line in lines:
+            sheet.append(line)
+
+    @staticmethod
+    def generate_graph(report, file_name='graph.png'):
+        """Генерирует png (или svg, по расширению файла) файл со статистикой вакансий на графиках
+
+            Args:
+                report (Report): Объект класса Report
+                file_name (str): Путь к файлу изображения
+
+            Returns:
+                float: Время построения графиков в секундах
+        """
+        return ChartRenderer.get_default().render(report, file_name)
+
+    @staticmethod
+    def generate_pdf(report, file_name='report.pdf', image_file='graph.png', backend=None):
+        """Генерирует pdf файл из png и excel файлов
+            Args:
+                report (Report): Объект класса Report
+                file_name (str): Путь к pdf файлу
+                image_file (str or bytes): Путь к файлу изображения с графиками или содержимое png изображения
+                backend (str or None): Способ формирования pdf, см. PdfBackends.get
+        """
+        vacancy = report.vacancy
+        if isinstance(image_file, bytes):
+            image_file = PdfBackends.to_data_uri(image_file)
+        else:
+            image_file = Path(image_file).resolve().as_uri()
+
         heads1 = ['Год', 'Средняя зарплата', f'Средняя зарплата - {report.vacancy}', 'Количество вакансий',
                   f'Количество вакансий - {report.vacancy}']
-        sheet2 = wb.create_sheet('Статистика по городам')
         heads2 = ['Город', 'Уровень зарплат', ' ', 'Город', 'Доля вакансий']
 
-        for i, head in enumerate(heads1):
-            sheet1.cell(row=1, column=(i + 1), value=head).font = Font(bold=True)
+        pdf_template = ReportTemplate.get_template().render({'vacancy': vacancy, 'image_file': image_file,
+                                        "salary_filter": report.salary_filter,
+                                        "vac_filter": report.vac_filter,
+                                        "vac_sal_filter": report.vac_sal_filter,
+                                        "vac_count_filter": report.vac_count_filter,
+                                        "salary_cities_filter": report.salary_cities_filter,
+                                        "vacs_cities": report.vacs_cities,
+                                        "heads1": heads1,
+                                        "heads2": heads2})
 
-        for year, value in report.salary_filter.items():
-            sheet1.append(
-                [year, value, report.vac_sal_filter[year], report.vac_filter[year], report.vac_count_filter[year]])
+        PdfBackends.get(backend).render(pdf_template, file_name)
 
-        for column_cells in sheet1.columns:
-            length = max(len(Report.as_text(cell.value)) for cell in column_cells)
-            sheet1.column_dimensions[column_cells[0].column_letter].width = length + 2
+    @staticmethod
+    def get_directory(vacancy):
+        """Возвращает папку для файлов отчета по профессии, чтобы отчеты разных профессий не перезаписывали друг друга.
+        Имя папки - название профессии без специальных символов и начало хэша исходного названия: разные названия,
+        в том числе отличающиеся только спецсимволами или регистром, получают разные папки
+            Args:
+                vacancy (str): Название профессии
+            Returns:
+                str: Путь к папке
 
-        thin = Side(border_style='thin', color='000000')
-        for column in sheet1.columns:
-            for cell in column:
-                cell.border = Border(left=thin, top=thin, right=thin, bottom=thin)
-
-        for i, head in enumerate(heads2):
-            if i + 1 != 3:
-                sheet2.cell(row=1, column=(i + 1), value=head).font = Font(bold=True)
-
-        sal_count = len(report.salary_cities_filter)
-        if sal_count > 10:
-            sal_count = 10
-
-        vac_count = len(report.vacs_cities)
-        if vac_count > 10:
-            vac_count = 10
-
-        dic = []
-        for i, head in enumerate(report.salary_cities_filter.items()):
-            if i < sal_count:
-                dic.append(list(head) + [''])
+            >>> Report.get_directory('Программист C++/C#')
+            'reports/Программист_C_C_74c6dd84'
+            >>> Report.get_directory('Программист C')
+            'reports/Программист_C_0c27d610'
+        """
+        slug = re.sub(r'[^\w\-]+', '_', vacancy).strip('_') or 'report'
+        return 'reports/' + slug + '_' + hashlib.sha1(vacancy.encode('utf-8')).hexdigest()[:8]
+
+    @staticmethod
+    def generate_all(report, directory, render_graph=True):
+        """Генерирует все файлы отчета в папке directory. Excel файл строится в отдельном потоке одновременно
+        с графиками, а pdf начинает формироваться сразу, как только готово изображение.
+        Изображение передается в pdf из памяти, без повторного чтения файла. Отчеты можно генерировать
+        из нескольких потоков, но графики общего ChartRenderer при этом строятся по очереди: параллельно
+        графики строятся только в разных процессах (ChartRenderer.render_many)
+            Args:
+                report (Report): Объект класса Report
+                directory (str): Папка для файлов отчета
+                render_graph (bool): Строить ли графики, False - если graph.png в папке уже построен
+        """
+        os.makedirs(directory, exist_ok=True)
+        image_file = os.path.join(directory, 'graph.png')
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            excel = executor.submit(Report.generate_excel, report, os.path.join(directory, 'report.xlsx'))
+            if render_graph:
+                image = BytesIO()
+                ChartRenderer.get_default().render(report, image, 'png')
+                image = image.getvalue()
+                with open(image_file, 'wb') as file:
+                    file.write(image)
             else:
-                break
+                with open(image_file, 'rb') as file:
+                    image = file.read()
+            Report.generate_pdf(report, os.path.join(directory, 'report.pdf'), image)
+            excel.result()
 
-        for i, head in enumerate(report.vacs_cities.items()):
-            if i < vac_count:
-                dic[i] += list(head)
 
-        for i, value in enumerate(dic):
-            sheet2.append(value)
-            sheet2[f'E{i + 2}'].number_format = FORMAT_PERCENTAGE_00
+class ReportTemplate:
+    """Класс хранит общее для процесса окружение Jinja и скомпилированный шаблон pdf отчета, поэтому при генерации
+    многих отчетов шаблон читается и компилируется один раз. Если задана переменная окружения REPORT_TEMPLATE_CACHE,
+    байт-код шаблона сохраняется в этой папке и переиспользуется следующими запусками программы
 
-        for column_cells in sheet2.columns:
-            lenght = max(len(Report.as_text(cell.value)) for cell in column_cells)
-            sheet2.column_dimensions[column_cells[0].column_letter].width = lenght + 2
+        Attributes:
+            directory (str): Папка с шаблоном
+            file_name (str): Название файла шаблона
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    file_name = 'pdf_template.html'
+    environment = None
+    template = None
 
-        for row in sheet2.rows:
-            for cell in row:
-                if cell.value != None and cell.value != '':
-                    cell.border = Border(left=thin, top=thin, right=thin, bottom=thin)
+    @staticmethod
+    def get_environment():
+        """Возвращает общее окружение Jinja с фильтрами форматирования отчета
 
-        wb.save('report.xlsx')
+            Returns:
+                Environment: Окружение, создаваемое при первом обращении
+        """
+        if ReportTemplate.environment is None:
+            cache_directory = os.environ.get('REPORT_TEMPLATE_CACHE')
+            bytecode_cache = None
+            if cache_directory:
+                os.makedirs(cache_directory, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(cache_directory)
+            environment = Environment(loader=FileSystemLoader(ReportTemplate.directory),
+                                      bytecode_cache=bytecode_cache, auto_reload=False)
+            environment.filters['percent'] = ReportTemplate.percent
+            ReportTemplate.environment = environment
+        return ReportTemplate.environment
 
     @staticmethod
-    def generate_graph(report):
-        """Генерирует png файл со статистикой вакансий на графиках
+    def get_template():
+        """Возвращает скомпилированный шаблон pdf отчета
+
+            Returns:
+                Template: Шаблон, компилируемый при первом обращении
+        """
+        if ReportTemplate.template is None:
+            ReportTemplate.template = ReportTemplate.get_environment().get_template(ReportTemplate.file_name)
+        return ReportTemplate.template
+
+    @staticmethod
+    def percent(value):
+        """Фильтр шаблона: переводит долю в проценты с запятой, не изменяя данные отчета
+
+            Args:
+                value (float or str): Доля
+
+            Returns:
+                str: Проценты
+
+            >>> ReportTemplate.percent(0.12345)
+            '12,345%'
+        """
+        return str(round(float(value) * 100, 3)).replace('.', ',') + '%'
+
+
+class ChartRenderer:
+    """Класс строит графики отчета без глобального состояния pyplot: фигура создается один раз с холстом Agg
+    и переиспользуется для следующих отчетов, оси лишь очищаются. Графики многих отчетов можно строить
+    параллельно только в нескольких процессах: в одном процессе построения на общей фигуре выполняются
+    по очереди под блокировкой lock, поэтому отчеты из разных потоков не рисуют на одних осях одновременно
+
+        Attributes:
+            figure (Figure): Фигура с четырьмя графиками
+            axes (list): Оси графиков
+            subplot_params (dict): Исходные отступы графиков, восстанавливаются перед каждым построением
+            timings (list): Время построения каждого графика в секундах
+            lock (threading.Lock): Блокировка фигуры на время построения
+    """
+    default = None
+    default_lock = threading.Lock()
+
+    def __init__(self):
+        """Инициализирует объект ChartRenderer и создает шаблон фигуры"""
+        self.figure = Figure(figsize=(8, 6))
+        FigureCanvasAgg(self.figure)
+        self.axes = [self.figure.add_subplot(221 + i) for i in range(4)]
+        params = self.figure.subplotpars
+        self.subplot_params = {name: getattr(params, name) for name in
+                               ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')}
+        self.timings = []
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_default():
+        """Возвращает общий для процесса объект ChartRenderer
+
+            Returns:
+                ChartRenderer: Объект, создаваемый при первом обращении
+        """
+        with ChartRenderer.default_lock:
+            if ChartRenderer.default is None:
+                ChartRenderer.default = ChartRenderer()
+        return ChartRenderer.default
+
+    def draw(self, report):
+        """Рисует графики отчета на очищенных осях шаблона
 
             Args:
                 report (Report): Объект класса Report
         """
+        for ax in self.axes:
+            ax.clear()
+        self.figure.subplots_adjust(**self.subplot_params)
         width = 0.4
         x_nums = np.arange(len(report.salary_filter.keys()))
         x_list1 = x_nums - width / 2
         x_list2 = x_nums + width / 2
-        fig = plt.figure(figsize=(8, 6))
 
-        ax = fig.add_subplot(221)
+        ax = self.axes[0]
         ax.set_title('Уровень зарплат по годам')
         ax.bar(x_list1, report.salary_filter.values(), width, label='средняя з/п')
         ax.bar(x_list2, report.vac_sal_filter.values(), width, label=f'з/п {report.vacancy.lower()}')
@@ -479,7 +1337,7 @@ class Report:
         ax.tick_params(axis='both', labelsize=8)
         ax.grid(True, axis='y')
 
-        ax = fig.add_subplot(222)
+        ax = self.axes[1]
         ax.set_title('Количество вакансий по годам')
         ax.bar(x_list1, report.vac_filter.values(), width, label='Количество вакансий')
         ax.bar(x_list2, report.vac_count_filter.values(), width, label=f'Количество вакансий\n{report.vacancy.lower()}')
@@ -488,68 +1346,126 @@ class Report:
         ax.tick_params(axis='both', labelsize=8)
         ax.grid(True, axis='y')
 
-        ax = fig.add_subplot(223)
+        ax = self.axes[2]
         ax.set_title("Уровень зарплат по городам")
         y = list(reversed(report.salary_cities_filter.keys()))
         y = [x.replace(' ', '\n').replace('-', '-\n') for x in y]
         x = list(reversed(report.salary_cities_filter.values()))
-        plt.barh(y, x)
+        ax.barh(y, x)
         ax.tick_params(axis='y', labelsize=6)
         ax.tick_params(axis='x', labelsize=8)
         ax.grid(True, axis='x')
 
-        ax = fig.add_subplot(224)
+        ax = self.axes[3]
         ax.set_title("Доля вакансий по городам")
         city_list = list(report.vacs_cities.keys())
         percent_list = list(report.vacs_cities.values())
         if report.others != 0:
             city_list.insert(0, 'Другие')
             percent_list.insert(0, 1 - sum(percent_list))
-        plt.pie(percent_list, labels=city_list, textprops={'fontsize': 6})
+        ax.pie(percent_list, labels=city_list, textprops={'fontsize': 6})
 
-        plt.tight_layout()
-        plt.savefig('graph.png')
-        # plt.show()
+        self.figure.tight_layout()
+
+    def render(self, report, file_name, image_format=None):
+        """Строит графики отчета и сохраняет их в файл или поток. Построения из разных потоков выполняются
+        по очереди
 
-    @staticmethod
-    def generate_pdf(report):
-        """Генерирует pdf файл из png и excel файлов
             Args:
                 report (Report): Объект класса Report
+                file_name (str or file): Путь к файлу или бинарный поток
+                image_format (str or None): 'png' или 'svg', по умолчанию - по расширению файла
+
+            Returns:
+                float: Время построения в секундах
         """
-        vacancy = report.vacancy
-        image_file = 'graph.png'
+        with self.lock:
+            start = time.perf_counter()
+            self.draw(report)
+            self.figure.savefig(file_name, format=image_format)
+            elapsed = time.perf_counter() - start
+            self.timings.append(elapsed)
+        return elapsed
 
-        options = {
-            "enable-local-file-access": None
-        }
+    @staticmethod
+    def render_file(report, file_name):
+        """Строит графики общим объектом процесса. Используется как задача для процессов-обработчиков
 
-        env = Environment(loader=FileSystemLoader('.'))
-        template = env.get_template("pdf_template.html")
-        heads1 = ['Год', 'Средняя зарплата', f'Средняя зарплата - {report.vacancy}', 'Количество вакансий',
-                  f'Количество вакансий - {report.vacancy}']
-        heads2 = ['Город', 'Уровень зарплат', ' ', 'Город', 'Доля вакансий']
-        report.vacs_cities = {key: (str(round(float(value) * 100, 3))).replace('.', ',') + '%' for key, value in
-                              report.vacs_cities.items()}
+            Args:
+                report (Report): Объект класса Report
+                file_name (str): Путь к файлу изображения
 
-        pdf_template = template.render({'vacancy': vacancy, 'image_file': image_file,
-                                        "salary_filter": report.salary_filter,
-                                        "vac_filter": report.vac_filter,
-                                        "vac_sal_filter": report.vac_sal_filter,
-                                        "vac_count_filter": report.vac_count_filter,
-                                        "salary_cities_filter": report.salary_cities_filter,
-                                        "vacs_cities": report.vacs_cities,
-                                        "heads1": heads1,
-                                        "heads2": heads2})
+            Returns:
+                float: Время построения в секундах
+        """
+        return ChartRenderer.get_default().render(report, file_name)
+
+    @staticmethod
+    def render_many(reports, file_names, max_workers=None):
+        """Параллельно строит графики многих отчетов в нескольких процессах и печатает время построения каждого
 
-        config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        pdfkit.from_string(pdf_template, 'report.pdf', configuration=config, options=options)
+            Args:
+                reports (list): Объекты класса Report
+                file_names (list): Пути к файлам изображений
+                max_workers (int or None): Количество процессов, по умолчанию - количество ядер
 
+            Returns:
+                list: Время построения каждого графика в секундах
+        """
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            timings = list(executor.map(ChartRenderer.render_file, reports, file_names))
+        for report, elapsed in zip(reports, timings):
+            print(f'График "{report.vacancy}" построен за {elapsed * 1000:.0f} мс')
+        return timings
 
-def get_table():
+
+def get_table(columnar=False, cache=False):
     """Используется в main.py. Формирует pdf файл.
+    Если вместо файла указана папка с частями part_{year}.csv, они обрабатываются параллельно
+
+        Args:
+            columnar (bool): Считать ли статистику по файлу векторно, через ColumnarDataSet
+            cache (bool): Брать ли колонки файла из кэша DatasetCache. Без columnar кэшируются очищенные
+                колонки DataSet, а вакансии загружаются в память целиком, а не читаются построчно
     """
     pars = InputParam()
     if pars.params is not None:
-        dataset = DataSet(pars.params[0])
-        InputParam.print_data(dataset.vacancies_objects, pars.params[1])
\ No newline at end of file
+        if os.path.isdir(pars.params[0]):
+            stats = StatsAccumulator.from_chunks(pars.params[0], pars.params[1])
+            InputParam.print_report(stats.get_report())
+            return
+        if columnar:
+            stats = ColumnarDataSet(pars.params[0], cache).get_stats(pars.params[1])
+            InputParam.print_report(stats.get_report())
+            return
+        dataset = DataSet(pars.params[0], stream=not cache, cache=cache)
+        InputParam.print_data(dataset.vacancies_objects, pars.params[1])
+
+
+def update_table():
+    """Используется в main.py. Дополняет сохраненную статистику новыми вакансиями и формирует отчет
+    только по сохраненному состоянию, без повторного чтения старых файлов
+    """
+    state_file = input("Введите название файла состояния: ")
+    file_name, vacancy = InputParam.get_params()
+    stats = StatsAccumulator.update(state_file, file_name, vacancy)
+    InputParam.print_report(stats.get_report())
+
+
+def get_batch_tables():
+    """Используется в main.py. Формирует отчеты сразу для нескольких профессий, прочитав файл один раз
+    """
+    file_name = input("Введите название файла: ")
+    keys = input("Введите названия профессий через запятую: ").split(', ')
+    directories = [Report.get_directory(key) for key in keys]
+    if len(set(directory.casefold() for directory in directories)) != len(directories):
+        print("Названия профессий повторяются")
+        exit()
+    stats = BatchStatsAccumulator(keys).add_all(DataSet.iter_vacancies(file_name))
+    reports = [stats.get_stats(key).get_report() for key in keys]
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+    ChartRenderer.render_many(reports, [os.path.join(directory, 'graph.png') for directory in directories])
+    for report, directory in zip(reports, directories):
+        print('Профессия:', report.vacancy)
+        InputParam.print_report(report, directory, render_graph=False)
@@ -0,0 +1,187 @@
+from bisect import bisect_right
+
+
+class IntervalTree:
+    """Центрированное дерево отрезков: находит все отрезки [low, high], содержащие точку, за O(log n + k).
+    В каждом узле отрезки, содержащие центр узла, хранятся отсортированными по левой и по правой границе,
+    поэтому подходящие отрезки узла берутся срезом после бинарного поиска. Отрезки с левой границей больше
+    правой не содержат ни одной точки и в дерево не попадают
+    """
+
+    def __init__(self, intervals):
+        """Инициализирует объект IntervalTree и строит дерево
+
+            Args:
+                intervals (list): Список троек (левая граница, правая граница, номер строки)
+        """
+        self.root = IntervalTree.build([interval for interval in intervals if interval[0] <= interval[1]])
+
+    @staticmethod
+    def build(intervals):
+        """Строит узел дерева
+
+            Args:
+                intervals (list): Список троек (левая граница, правая граница, номер строки)
+
+            Returns:
+                tuple or None: Центр, левые границы, номера по левым границам, правые границы со знаком минус,
+                    номера по правым границам, левое и правое поддеревья
+        """
+        if not intervals:
+            return None
+        points = sorted(point for low, high, _ in intervals for point in (low, high))
+        center = points[len(points) // 2]
+        left, right, middle = [], [], []
+        for interval in intervals:
+            if interval[1] < center:
+                left.append(interval)
+            elif interval[0] > center:
+                right.append(interval)
+            else:
+                middle.append(interval)
+        by_low = sorted((low, number) for low, _, number in middle)
+        by_high = sorted((-high, number) for _, high, number in middle)
+        return (center, [low for low, _ in by_low], [number for _, number in by_low],
+                [high for high, _ in by_high], [number for _, number in by_high],
+                IntervalTree.build(left), IntervalTree.build(right))
+
+    def find(self, point):
+        """Возвращает номера строк, отрезки которых содержат точку
+
+            Args:
+                point (int or float): Точка
+
+            Returns:
+                list: Номера строк в произвольном порядке
+
+            >>> sorted(IntervalTree([(10, 20, 0), (15, 30, 1), (40, 50, 2)]).find(17))
+            [0, 1]
+            >>> IntervalTree([(10, 20, 0)]).find(21)
+            []
+            >>> IntervalTree([(300, 250, 0), (100, 200, 1)]).find(150)
+            [1]
+        """
+        result = []
+        node = self.root
+        while node is not None:
+            center, lows, low_numbers, highs, high_numbers, left, right = node
+            if point < center:
+                result.extend(low_numbers[:bisect_right(lows, point)])
+                node = left
+            elif point > center:
+                result.extend(high_numbers[:bisect_right(highs, -point)])
+                node = right
+            else:
+                result.extend(low_numbers)
+                break
+        return result
+
+
+class TableIndex:
+    """Класс строит индексы по колонкам списка строк и выбирает строки, подходящие под несколько условий сразу (И).
+    Индекс колонки строится при первом запросе к ней и переиспользуется следующими запросами:
+        'hash' - словарь значение -> номера строк, для точного совпадения;
+        'inverted' - обратный индекс элемент -> номера строк, строка подходит, если содержит все элементы запроса;
+        'interval' - дерево отрезков IntervalTree, строка подходит, если ее отрезок содержит число из запроса
+
+        Attributes:
+            rows (list): Строки
+            columns (dict): Название колонки -> (вид индекса, функция получения ключа строки). Функция возвращает
+                значение, список элементов или пару границ, None - если строка не попадает в индекс
+            indexes (dict): Построенные индексы
+    """
+
+    def __init__(self, rows, columns):
+        """Инициализирует объект TableIndex
+
+            Args:
+                rows (list): Строки
+                columns (dict): Название колонки -> (вид индекса, функция получения ключа строки)
+        """
+        self.rows = rows
+        self.columns = columns
+        self.indexes = {}
+
+    def get_index(self, name):
+        """Возвращает индекс колонки, строя его при первом обращении
+
+            Args:
+                name (str): Название колонки
+
+            Returns:
+                dict or IntervalTree: Индекс колонки
+        """
+        index = self.indexes.get(name)
+        if index is not None:
+            return index
+        kind, get_key = self.columns[name]
+        if kind == 'interval':
+            intervals = []
+            for number, row in enumerate(self.rows):
+                key = get_key(row)
+                if key is not None:
+                    intervals.append((key[0], key[1], number))
+            index = IntervalTree(intervals)
+        else:
+            index = {}
+            for number, row in enumerate(self.rows):
+                key = get_key(row)
+                if key is None:
+                    continue
+                for item in (key if kind == 'inverted' else (key,)):
+                    numbers = index.setdefault(item, [])
+                    if not numbers or numbers[-1] != number:
+                        numbers.append(number)
+        self.indexes[name] = index
+        return index
+
+    def find(self, name, value):
+        """Возвращает номера строк, подходящих под одно условие
+
+            Args:
+                name (str): Название колонки
+                value: Значение, список элементов или число - в зависимости от вида индекса
+
+            Returns:
+                list or set: Номера строк
+        """
+        kind = self.columns[name][0]
+        index = self.get_index(name)
+        if kind == 'interval':
+            return index.find(value)
+        if kind == 'hash':
+            return index.get(value, [])
+        found = sorted((index.get(item, []) for item in set(value)), key=len)
+        if not found:
+            return []
+        numbers = set(found[0])
+        for other in found[1:]:
+            numbers.intersection_update(other)
+        return numbers
+
+    def select(self, conditions):
+        """Возвращает строки, подходящие под все условия, в исходном порядке
+
+            Args:
+                conditions (list): Список пар (название колонки, значение)
+
+            Returns:
+                list: Подходящие строки
+
+            >>> index = TableIndex([{'city': 'A', 'skills': ['Git']}, {'city': 'B', 'skills': ['Git', 'SQL']}],
+            ...                    {'city': ('hash', lambda row: row['city']),
+            ...                     'skills': ('inverted', lambda row: row['skills'])})
+            >>> index.select([('skills', ['Git'])]) == index.rows
+            True
+            >>> index.select([('skills', ['Git']), ('city', 'B')])
+            [{'city': 'B', 'skills': ['Git', 'SQL']}]
+        """
+        if not conditions:
+            return list(self.rows)
+        found = sorted((self.find(name, value) for name, value in conditions), key=len)
+        numbers = set(found[0])
+        for other in found[1:]:
+            if not numbers:
+                break
+            numbers.intersection_update(other)
+        return [self.rows[number] for number in sorted(numbers)]
@@ -1,9 +1,16 @@
 import csv
+import heapq
 import math
-import re
 import prettytable
 from datetime import datetime
+from operator import attrgetter
 from prettytable import PrettyTable
+from columnar_store import ColumnarStore
+from currency_rates import CurrencyRates
+from dataset_cache import DatasetCache
+from mmap_reader import MappedCsv
+from table_index import TableIndex
+from text_cleaner import Cleaner
 
 
 class Tools:
@@ -24,11 +31,93 @@ class Tools:
 
     rus_true_false = {'True': 'Да', 'False': 'Нет'}
 
+    salary_columns = ('salary_from', 'salary_to', 'salary_gross', 'salary_currency')
+    filter_separator = '; '
+
     @staticmethod
     def exit_with_print(line):
         print(line)
         exit()
 
+    @staticmethod
+    def parse_filter(filter_param):
+        """Разбивает параметр фильтрации на условия, объединяемые через И и разделенные '; '
+
+            Args:
+                filter_param (str): Параметр фильтрации
+
+            Returns:
+                list: Список пар (столбец, значение)
+
+            >>> Tools.parse_filter('Навыки: Git, SQL; Название региона: Москва')
+            [('Навыки', 'Git, SQL'), ('Название региона', 'Москва')]
+            >>> Tools.parse_filter('')
+            []
+        """
+        if filter_param == '':
+            return []
+        return [tuple(part.split(': ', 1)) for part in filter_param.split(Tools.filter_separator)]
+
+    @staticmethod
+    def get_columns(filter_param, sort_param, fields_list):
+        """Определяет колонки csv файла, нужные для вывода: выбранные пользователем столбцы,
+        а также столбцы фильтрации и сортировки. Оклад требует всех колонок зарплаты и даты публикации,
+        по месяцу которой выбирается курс валюты
+
+            Args:
+                filter_param (str): Параметр фильтрации
+                sort_param (str): Параметр сортировки
+                fields_list (list): Требуемые столбцы
+
+            Returns:
+                set or None: Названия колонок или None, если нужны все колонки
+
+            >>> sorted(Tools.get_columns('Навыки: Git', '', ['Название']))
+            ['key_skills', 'name']
+            >>> sorted(Tools.get_columns('', 'Оклад', ['Название']))
+            ['name', 'published_at', 'salary_currency', 'salary_from', 'salary_gross', 'salary_to']
+            >>> Tools.get_columns('', '', [''])
+        """
+        if fields_list == ['']:
+            return None
+        names = list(fields_list)
+        names.extend(name for name, _ in Tools.parse_filter(filter_param))
+        if sort_param != '':
+            names.append(sort_param)
+        columns = set()
+        for name in names:
+            column = Tools.rus_names.get(name)
+            if column in Tools.salary_columns:
+                columns.update(Tools.salary_columns)
+                columns.add('published_at')
+            elif column is not None:
+                columns.add(column)
+        return columns
+
+    @staticmethod
+    def get_pushdown(filter_param):
+        """Определяет годы и регионы, которыми можно заранее ограничить чтение колоночного файла:
+        фильтрация по дате публикации оставляет один год, по региону - один регион
+
+            Args:
+                filter_param (str): Параметр фильтрации
+
+            Returns:
+                Tuple (list or None, list or None): Годы и регионы, None - если ограничения нет
+
+            >>> Tools.get_pushdown('Дата публикации вакансии: 05.07.2022; Название региона: Москва')
+            ([2022], ['Москва'])
+            >>> Tools.get_pushdown('Навыки: Git')
+            (None, None)
+        """
+        years, areas = None, None
+        for name, value in Tools.parse_filter(filter_param):
+            if name == 'Дата публикации вакансии' and value[-4:].isdigit():
+                years = [int(value[-4:])]
+            elif name == 'Название региона':
+                areas = [value] + [key for key, rus in Tools.rus_true_false.items() if rus == value]
+        return years, areas
+
     @staticmethod
     def prepare(line):
         """Очищает входную строку и возвращает очищенную для дальнейшего использования
@@ -39,21 +128,25 @@ class Tools:
             Returns:
                 str: Очищенная строка
         """
-        string = re.sub(r"<[^>]+>", '', line)
-        if '\n' not in string:
-            string = ' '.join(string.split())
-        if string == 'True' or string == 'False':
-            string = Tools.rus_true_false[string]
-        return string
+        return Cleaner.clean_table(line)
 
 
 class Vacancy:
-    """Класс устанавливает все основные поля вакансии, а также хранит словарь dic_experience для перевода опыта работы
+    """Класс устанавливает все основные поля вакансии, а также хранит словарь dic_experience для перевода опыта работы.
+    Поля, колонки которых не были прочитаны из файла, остаются пустыми. Поля хранятся в __slots__,
+    границы оклада и середина вилки в рублях вычисляются один раз при создании вакансии,
+    опыт работы переводится из исходной строки только при первом обращении
     """
+    __slots__ = ('name', 'description', 'key_skills', '_experience_id', 'premium', 'employer_name', 'salary',
+                 'area_name', 'published_at')
     dic_experience = {"noExperience": "Нет опыта",
                       "between1And3": "От 1 года до 3 лет",
                       "between3And6": "От 3 до 6 лет",
                       "moreThan6": "Более 6 лет"}
+    experience_rank = {"noExperience": 0,
+                       "between1And3": 1,
+                       "between3And6": 2,
+                       "moreThan6": 3}
 
     def __init__(self, dictionary):
         """Инициализирует объект Vacancy
@@ -65,44 +158,69 @@ class Vacancy:
                 experience_id (str): Опыт работы
                 premium (str): Информация о том премиум вакансия или нет
                 employer_name (str): Компания
-                salary (Salary): Комбинированная информация о зарплате
+                salary (Salary or None): Комбинированная информация о зарплате, None - если оклад не прочитан
                 area_name (str): Название региона
                 published_at (str): Дата публикации вакансии
         """
-        self.name = dictionary['name']
-        self.description = dictionary['description']
-        self.key_skills = dictionary['key_skills']
-        self.experience_id = Vacancy.dic_experience[dictionary['experience_id']]
-        self.premium = dictionary['premium']
-        self.employer_name = dictionary['employer_name']
-        self.salary = Salary(dictionary['salary_from'], dictionary['salary_to'], dictionary['salary_gross'],
-                             dictionary['salary_currency'])
-        self.area_name = dictionary['area_name']
-        self.published_at = dictionary['published_at']
+        self.name = dictionary.get('name', '')
+        self.description = dictionary.get('description', '')
+        self.key_skills = dictionary.get('key_skills', '')
+        self._experience_id = dictionary.get('experience_id')
+        self.premium = dictionary.get('premium', '')
+        self.employer_name = dictionary.get('employer_name', '')
+        self.area_name = dictionary.get('area_name', '')
+        self.published_at = dictionary.get('published_at', '')
+        self.salary = None
+        if 'salary_from' in dictionary:
+            self.salary = Salary(dictionary['salary_from'], dictionary['salary_to'], dictionary['salary_gross'],
+                                 dictionary['salary_currency'], self.published_at)
+
+    @property
+    def experience_id(self):
+        return Vacancy.dic_experience.get(self._experience_id, '')
+
+    def get_sort_key(self, sort):
+        """Возвращает типизированный ключ сортировки вакансии
+
+            Args:
+                sort (str): Параметр сортировки
+
+            Returns:
+                int or float or str or datetime: Ключ сортировки
+        """
+        return Vacancy.sort_keys[sort](self)
+
+    sort_keys = {'Название': lambda vacancy: vacancy.name,
+                 'Описание': lambda vacancy: vacancy.description,
+                 'Навыки': lambda vacancy: len(vacancy.key_skills.split('\n')),
+                 'Опыт работы': lambda vacancy: Vacancy.experience_rank[vacancy._experience_id],
+                 'Премиум-вакансия': lambda vacancy: vacancy.premium,
+                 'Компания': lambda vacancy: vacancy.employer_name,
+                 'Оклад': lambda vacancy: vacancy.salary.salary_to_rub,
+                 'Верхняя граница вилки оклада': lambda vacancy: vacancy.salary.salary_to,
+                 'Оклад указан до вычета налогов': lambda vacancy: vacancy.salary.salary_gross,
+                 'Идентификатор валюты оклада':
+                     lambda vacancy: InputParam.get_currency_name(vacancy.salary.salary_currency),
+                 'Название региона': lambda vacancy: vacancy.area_name,
+                 'Дата публикации вакансии':
+                     lambda vacancy: datetime.strptime(vacancy.published_at, '%Y-%m-%dT%H:%M:%S%z')}
 
 
 class Salary:
-    """Класс устанавливает все поля для представления зарплаты, хранит словарь для перевода курсов
+    """Класс устанавливает все поля для представления зарплаты: границы вилки хранятся целыми числами,
+    а середина вилки в рублях по курсу месяца публикации (CurrencyRates) вычисляется при создании
     """
-    currency_to_rub = {"AZN": 35.68,
-                       "BYR": 23.91,
-                       "EUR": 59.90,
-                       "GEL": 21.74,
-                       "KGS": 0.76,
-                       "KZT": 0.13,
-                       "RUR": 1,
-                       "UAH": 1.64,
-                       "USD": 60.66,
-                       "UZS": 0.0055}
-
-    def __init__(self, salary_from, salary_to, salary_gross, salary_currency):
+    __slots__ = ('salary_from', 'salary_to', 'salary_gross', 'salary_currency', 'salary_to_rub')
+
+    def __init__(self, salary_from, salary_to, salary_gross, salary_currency, published_at=None):
         """Инициализирует объект Salary
 
             Args:
-                salary_from (int of int of float): Нижняя граница вилки оклада
-                salary_to (int of int of float): Верхняя граница вилки оклада
+                salary_from (str or int or float): Нижняя граница вилки оклада
+                salary_to (str or int or float): Верхняя граница вилки оклада
                 salary_gross (str): Информация о том с вычитом ли налогов зп или нет
                 salary_currency (str): Валюта оклада
+                published_at (str or None): Дата публикации вакансии, None - постоянный курс
 
             >>> type(Salary(10.0, 20.4, 'Нет' ,'RUR')).__name__
             'Salary'
@@ -112,27 +230,15 @@ class Salary:
             20
             >>> Salary('10.0', 20.4, 'Нет' ,'RUR').salary_currency
             'RUR'
+            >>> Salary('10.0', '20.4', 'Нет', 'EUR').salary_to_rub
+            898.5
         """
-        self.salary_from = salary_from
-        self.salary_to = salary_to
+        self.salary_from = math.trunc(float(salary_from))
+        self.salary_to = math.trunc(float(salary_to))
         self.salary_gross = salary_gross
         self.salary_currency = salary_currency
-
-    @staticmethod
-    def get_salary_ru(salary_from, salary_to, salary_currency):
-        """Используется для перевода нижней и верхней границы вилки оклада для дальнейшего получения средней зарплаты
-
-            Args:
-                salary_from (int): Нижняя граница вилки оклада
-                salary_to (int): Верхняя граница вилки оклада
-                salary_currency (str): Валюта оклада
-
-            Returns:
-                Tuple (int, int): Переведённые нижняя и верхяя граница вилки оклада
-        """
-        salary_from = int(float(salary_from)) * Salary.currency_to_rub[InputParam.curr_invert[salary_currency]]
-        salary_to = int(float(salary_to)) * Salary.currency_to_rub[InputParam.curr_invert[salary_currency]]
-        return salary_from, salary_to
+        rate = CurrencyRates.get().get_rate(salary_currency, published_at)
+        self.salary_to_rub = (self.salary_from * rate + self.salary_to * rate) / 2
 
 
 class DataSet:
@@ -141,22 +247,111 @@ class DataSet:
         Attributes:
             file_name (str): Название файла
             vacancies_objects (list): Список вакансий
+            index (TableIndex or None): Индексы для фильтрации, строятся при первой фильтрации
     """
 
-    def __init__(self, file_name):
-        """Инициализирует объект DataSet.
+    def __init__(self, file_name, columns=None, cache=False, mapped=False, years=None, areas=None):
+        """Инициализирует объект DataSet. Файлы .parquet, .feather и .arrow из "Splitting into chunks.py"
+        читаются напрямую через ColumnarStore, годы и регионы ограничивают только их чтение
 
             Args:
                 file_name (str): Название файла
+                columns (set or None): Колонки, которые нужно прочитать, None - все колонки
+                cache (bool): Брать ли очищенные колонки из кэша DatasetCache
+                mapped (bool): Читать ли файл через mmap (MappedCsv), декодируя только нужные колонки
+                years (iterable or None): Нужные годы публикации колоночного файла, None - все годы
+                areas (iterable or None): Нужные регионы колоночного файла, None - все регионы
                 vacancies_objects (list): Список вакансий
         """
         self.file_name = file_name
-        data_tuple = DataSet.csv_reader(file_name)
-        dic = DataSet.csv_filter(data_tuple[0], data_tuple[1])
+        if ColumnarStore.is_columnar(file_name):
+            dic = DataSet.load_columnar(file_name, columns, years, areas)
+        elif cache:
+            dic = DataSet.load_cached(file_name, columns, mapped)
+        else:
+            dic = DataSet.read_rows(file_name, columns, mapped)
         vacancies_objects = []
         for dictionary in dic:
             vacancies_objects.append(Vacancy(dictionary))
         self.vacancies_objects = vacancies_objects
+        self.index = None
+
+    @staticmethod
+    def load_cached(file_name, columns=None, mapped=False):
+        """Возвращает очищенные вакансии из кэша, а если их там нет - читает файл и сохраняет колонки в кэш
+
+            Args:
+                file_name (str): Название файла
+                columns (set or None): Колонки, которые нужно прочитать, None - все колонки
+                mapped (bool): Читать ли файл через mmap
+
+            Returns:
+                list: Очищенный лист словарей
+        """
+        tag = 'table_out.DataSet:' + (','.join(sorted(columns)) if columns is not None else '*')
+        data = DatasetCache.load(file_name, tag)
+        if data is not None:
+            names = list(data)
+            return [dict(zip(names, values)) for values in zip(*data.values())]
+        dic = DataSet.read_rows(file_name, columns, mapped)
+        names = list(dic[0]) if dic else []
+        DatasetCache.save(file_name, tag, {name: [row[name] for row in dic] for name in names})
+        return dic
+
+    @staticmethod
+    def load_columnar(file_name, columns=None, years=None, areas=None):
+        """Читает файл .parquet, .feather или .arrow: только нужные колонки и только строки нужных годов
+        и регионов. True/False переводятся один раз на значение словаря колонки
+
+            Args:
+                file_name (str): Название файла
+                columns (set or None): Колонки, которые нужно прочитать, None - все колонки
+                years (iterable or None): Нужные годы публикации, None - все годы
+                areas (iterable or None): Нужные регионы, None - все регионы
+
+            Returns:
+                list: Очищенный лист словарей
+        """
+        data = ColumnarStore.read(file_name, columns, years, areas, Cleaner.clean_table)
+        names = list(data)
+        return [dict(zip(names, values)) for values in zip(*data.values())]
+
+    @staticmethod
+    def read_rows(file_name, columns=None, mapped=False):
+        """Читает и очищает вакансии из csv файла
+
+            Args:
+                file_name (str): Название файла
+                columns (set or None): Колонки, которые нужно прочитать, None - все колонки
+                mapped (bool): Читать ли файл через mmap
+
+            Returns:
+                list: Очищенный лист словарей
+        """
+        if mapped:
+            return DataSet.mapped_reader(file_name, columns)
+        data_tuple = DataSet.csv_reader(file_name)
+        return DataSet.csv_filter(data_tuple[0], data_tuple[1], columns)
+
+    @staticmethod
+    def mapped_reader(file_name, columns=None):
+        """Считывает csv файл через mmap: декодируются и очищаются только нужные колонки
+
+            Args:
+                file_name (str): Название файла
+                columns (set or None): Колонки, которые нужно прочитать, None - все колонки
+
+            Returns:
+                list: Очищенный лист словарей
+        """
+        with MappedCsv(file_name) as mapped:
+            if not mapped.heads:
+                Tools.exit_with_print("Пустой файл")
+            if mapped.data_start >= mapped.size:
+                Tools.exit_with_print("Нет данных")
+            names = [name for name in mapped.heads if columns is None or name in columns]
+            indexes = [mapped.heads.index(name) for name in names]
+            return [dict(zip(names, map(Cleaner.clean_table, values))) for values in mapped.iter_rows(indexes)]
 
     @staticmethod
     def csv_reader(file_name):
@@ -181,24 +376,21 @@ class DataSet:
         return vacancies, columns
 
     @staticmethod
-    def csv_filter(reader, list_naming):
-        """Очищает и переводит входной файл
+    def csv_filter(reader, list_naming, columns=None):
+        """Очищает и переводит входной файл, ненужные колонки пропускаются без очистки
 
             Args:
                 reader (list): csv файл
                 list_naming (list): Словарь для перевода csv файла
+                columns (set or None): Нужные колонки, None - все колонки
 
             Returns:
                 list: Очищенный лист
         """
-        resumes = []
-        sentences = {}
-        for resume in reader:
-            for i in range(len(resume)):
-                resume[i] = Tools.prepare(resume[i])
-                sentences[list_naming[i]] = resume[i]
-            resumes.append(sentences.copy())
-        return resumes
+        if columns is None:
+            columns = list_naming
+        clean_row = Cleaner.get_row_cleaner(list_naming, columns, Cleaner.clean_table)
+        return [clean_row(resume) for resume in reader]
 
 
 class InputParam:
@@ -213,20 +405,28 @@ class InputParam:
             columns_param (str): Требуемые столбцы
     """
 
-    def __init__(self):
+    def __init__(self, cache=False):
         """Инициализирует объект InputConect, запускает проверку правильности введенных данных
 
             Args:
+                cache (bool): Брать ли очищенные колонки из кэша DatasetCache
                 data_set (list): Список словарей с вакансиями
                 params (list): Список параметров
         """
         params = InputParam.get_params()
-        data_set = DataSet(params[0])
+        years, areas = Tools.get_pushdown(params[1])
+        data_set = DataSet(params[0], Tools.get_columns(params[1], params[2], params[5]), cache,
+                           years=years, areas=areas)
         InputParam.print_vacancies(data_set, params[1], params[2], params[3], params[4], params[5])
 
     @staticmethod
     def get_date(date):
-        return int(date[8:10]+'.'+date[5:7]+'.'+date[0:4])
+        """Переводит дату публикации в формат ДД.ММ.ГГГГ
+
+            >>> InputParam.get_date('2022-07-05T18:19:30+0300')
+            '05.07.2022'
+        """
+        return date[8:10] + '.' + date[5:7] + '.' + date[0:4]
 
     @staticmethod
     def get_params():
@@ -243,17 +443,49 @@ class InputParam:
         range_param = input("Введите диапазон вывода: ").split()
         columns_param = input("Введите требуемые столбцы: ").split(', ')
 
-        if filter_param != "" and ': ' not in filter_param:
-            Tools.exit_with_print('Формат ввода некорректен')
-        if filter_param != '' and filter_param.split(': ')[0] not in Tools.rus_names:
-            Tools.exit_with_print('Параметр поиска некорректен')
-        if sort_param != '' and sort_param not in Tools.rus_names:
-            Tools.exit_with_print('Параметр сортировки некорректен')
-        if invert_param != '' and invert_param not in Tools.rus_true_false.values():
-            Tools.exit_with_print('Порядок сортировки задан некорректно')
+        error = InputParam.check_params(filter_param, sort_param, invert_param)
+        if error is not None:
+            Tools.exit_with_print(error)
 
         return file_name, filter_param, sort_param, invert_param, range_param, columns_param
 
+    @staticmethod
+    def check_params(filter_param='', sort_param='', invert_param='', columns_param=''):
+        """Проверяет параметры фильтрации, сортировки и требуемые столбцы
+
+            Args:
+                filter_param (str): Параметр фильтрации
+                sort_param (str): Параметр сортировки
+                invert_param (str): Обратный ли порядок сортировки
+                columns_param (str): Требуемые столбцы через ', ', пустая строка - все столбцы
+
+            Returns:
+                str or None: Сообщение об ошибке, None - если параметры корректны
+
+            >>> InputParam.check_params('Навыки: Git; Оклад', 'Оклад')
+            'Формат ввода некорректен'
+            >>> InputParam.check_params('Оклад: много')
+            'Параметр поиска некорректен'
+            >>> InputParam.check_params(sort_param='Оклад', invert_param='Да')
+            >>> InputParam.check_params(columns_param='Название, Оклат')
+            'Столбцы заданы некорректно'
+        """
+        for part in filter_param.split(Tools.filter_separator) if filter_param != '' else []:
+            if ': ' not in part:
+                return 'Формат ввода некорректен'
+            name, value = part.split(': ', 1)
+            if name not in Tools.rus_names:
+                return 'Параметр поиска некорректен'
+            if InputParam.filter_columns[name][0] == 'interval' and not value.lstrip('-').isdigit():
+                return 'Параметр поиска некорректен'
+        if sort_param != '' and sort_param not in Tools.rus_names:
+            return 'Параметр сортировки некорректен'
+        if invert_param != '' and invert_param not in Tools.rus_true_false.values():
+            return 'Порядок сортировки задан некорректно'
+        if columns_param != '' and any(name not in InputParam.cell_formatters for name in columns_param.split(', ')):
+            return 'Столбцы заданы некорректно'
+        return None
+
     dic_currency = {"AZN": "Манаты",
                     "BYR": "Белорусские рубли",
                     "EUR": "Евро",
@@ -267,9 +499,48 @@ class InputParam:
 
     curr_invert = {value: key for key, value in dic_currency.items()}
 
+    @staticmethod
+    def get_currency_name(salary_currency):
+        """Возвращает название валюты. Валюты, которых нет в dic_currency (например, добавленные только в файл
+        курсов CurrencyRates), выводятся, фильтруются и сортируются по своему коду
+
+            Args:
+                salary_currency (str): Код валюты
+
+            Returns:
+                str: Название валюты или код, если название неизвестно
+
+            >>> InputParam.get_currency_name('EUR')
+            'Евро'
+            >>> InputParam.get_currency_name('CNY')
+            'CNY'
+        """
+        return InputParam.dic_currency.get(salary_currency, salary_currency)
+
+    filter_columns = {
+        'Название': ('hash', attrgetter('name')),
+        'Описание': ('hash', attrgetter('description')),
+        'Навыки': ('inverted', lambda row: row.key_skills.split('\n') if row.key_skills else None),
+        'Опыт работы': ('hash', attrgetter('experience_id')),
+        'Премиум-вакансия': ('hash', attrgetter('premium')),
+        'Компания': ('hash', attrgetter('employer_name')),
+        'Оклад': ('interval', lambda row: None if row.salary is None else
+                  (row.salary.salary_from, row.salary.salary_to)),
+        'Верхняя граница вилки оклада': ('hash', lambda row: None if row.salary is None else
+                                         str(row.salary.salary_to)),
+        'Оклад указан до вычета налогов': ('hash', lambda row: None if row.salary is None else
+                                           row.salary.salary_gross),
+        'Идентификатор валюты оклада': ('hash', lambda row: None if row.salary is None else
+                                        InputParam.get_currency_name(row.salary.salary_currency)),
+        'Название региона': ('hash', attrgetter('area_name')),
+        'Дата публикации вакансии': ('hash', lambda row: InputParam.get_date(row.published_at)
+                                     if row.published_at else None)}
+
+    filter_values = {'hash': str, 'inverted': lambda value: value.split(', '), 'interval': int}
+
     @staticmethod
     def curr_formatter(salary_from, salary_to, salary_gross, salary_currency):
-        """Проверяет параметры и переводит данные
+        """Проверяет параметры и переводит данные, разделяя разряды границ вилки пробелами
 
             Args:
                 salary_from (int): Нижняя граница вилки оклада
@@ -279,162 +550,221 @@ class InputParam:
 
             Returns:
                 str: Нижняя, верхняя граница вилки оклада, валюту и вычет налогов
+
+            >>> InputParam.curr_formatter('100000.0', '150000', 'Нет', 'RUR')
+            '100 000 - 150 000 (Рубли) (С вычетом налогов)'
         """
-        currency = InputParam.dic_currency[salary_currency]
+        currency = InputParam.get_currency_name(salary_currency)
         if salary_gross == 'Нет':
             gross = 'С вычетом налогов'
         else:
             gross = 'Без вычета налогов'
-        salary_from = math.trunc(float(salary_from))
-        salary_to = math.trunc(float(salary_to))
+        salary_from = '{0:,}'.format(math.trunc(float(salary_from))).replace(',', ' ')
+        salary_to = '{0:,}'.format(math.trunc(float(salary_to))).replace(',', ' ')
         return f'{salary_from} - {salary_to} ({currency}) ({gross})'
 
     @staticmethod
-    def formatter(row):
-        """Фильтрует вакансию
+    def get_salary_cell(row):
+        """Возвращает текст ячейки оклада
 
             Args:
-                row (dict): Словарь с одной вакансией
+                row (Vacancy): Вакансия
 
             Returns:
-                dict: Возвращает вакансию, если она подходит под параметр фильтрации
-        """
-        dic = {}
-        dic_names = list(Tools.rus_names.values())
-        dic_names = dic_names[:7] + dic_names[10:]
-        for key in dic_names:
-            if key == 'salary_from':
-                dic[key] = InputParam.curr_formatter(row.salary.salary_from, row.salary.salary_to,
-                                                     row.salary.salary_gross, row.salary.salary_currency)
-                continue
-            else:
-                dic[key] = getattr(row, key)
-        return dic
+                str: Вилка оклада или пустая строка, если оклад не прочитан
+        """
+        if row.salary is None:
+            return ''
+        return InputParam.curr_formatter(row.salary.salary_from, row.salary.salary_to, row.salary.salary_gross,
+                                         row.salary.salary_currency)
+
+    cell_formatters = {'Название': attrgetter('name'),
+                       'Описание': attrgetter('description'),
+                       'Навыки': attrgetter('key_skills'),
+                       'Опыт работы': attrgetter('experience_id'),
+                       'Премиум-вакансия': attrgetter('premium'),
+                       'Компания': attrgetter('employer_name'),
+                       'Оклад': lambda row: InputParam.get_salary_cell(row),
+                       'Название региона': attrgetter('area_name'),
+                       'Дата публикации вакансии': lambda row: InputParam.get_date(row.published_at)
+                       if row.published_at else ''}
 
     @staticmethod
-    def do_filter(data, filter_list):
-        """Фильтрует данные
+    def formatter(row, fields=None):
+        """Переводит вакансию в строку таблицы: форматирует только нужные столбцы и обрезает длинный текст
 
             Args:
-                data (list): Входные данные
-                filter_list (str): Введенный параметр
+                row (Vacancy): Вакансия
+                fields (list or None): Столбцы таблицы без '№', None - все столбцы
 
             Returns:
-                list: Отфильтрованные данные
+                list: Текст ячеек
         """
+        cells = []
+        for field in fields or InputParam.cell_formatters:
+            cell = InputParam.cell_formatters[field](row)
+            if len(cell) > 100:
+                cell = cell[:100] + '...'
+            cells.append(cell)
+        return cells
 
-        def for_filter(row):
-            """Фильтрует данные
+    @staticmethod
+    def do_filter(data_set, filter_list):
+        """Фильтрует вакансии по индексам колонок: точное совпадение ищется в хэш-индексе, навыки - в обратном
+        индексе, оклад - в дереве отрезков. Несколько условий, разделенных '; ', объединяются через И
 
-                Args:
-                    row (): Входные данные
+            Args:
+                data_set (DataSet): Данные с вакансиями
+                filter_list (str): Введенный параметр
 
-                Returns:
-                    row (list): Отфильтрованные данные по парметрам
-            """
-            if filter_list == '':
-                return True
-            parameter = filter_list.split(': ')
-            if parameter[0] == 'Оклад':
-                salary = row['salary_from'].split()
-                salary_from = salary[0]
-                salary_to = salary[2]
-                return int(salary_from) <= int(parameter[1]) <= int(salary_to)
-            if parameter[0] == 'Идентификатор валюты оклада':
-                return row['salary_from'].split()[3].replace('(', '').replace(')', '') == parameter[1]
-            if parameter[0] == 'Навыки':
-                parameters = parameter[1].split(', ')
-                list_skill = row['key_skills'].split('\n')
-                k = 0
-                for x in parameters:
-                    if x in list_skill:
-                        k = k + 1
-                return k == len(parameters)
-            if parameter[0] == 'Дата публикации вакансии':
-                return InputParam.get_date(row['published_at']) == parameter[1]
-            return row[Tools.rus_names[parameter[0]]] == parameter[1]
-
-        filtered_list = list(filter(for_filter, data))
+            Returns:
+                list: Отфильтрованные вакансии в исходном порядке
+        """
+        filtered_list = InputParam.select(data_set, filter_list)
         if not filtered_list:
             Tools.exit_with_print('Ничего не найдено')
         return filtered_list
 
     @staticmethod
-    def do_sort(data, sort, reverse):
-        """Сортирует данные по параметрам
+    def select(data_set, filter_list):
+        """Выбирает вакансии, подходящие под параметр фильтрации, строя индексы данных при первом обращении
+
+            Args:
+                data_set (DataSet): Данные с вакансиями
+                filter_list (str): Введенный параметр
+
+            Returns:
+                list: Подходящие вакансии в исходном порядке, возможно пустой
+        """
+        if data_set.index is None:
+            data_set.index = TableIndex(data_set.vacancies_objects, InputParam.filter_columns)
+        conditions = [(name, InputParam.filter_values[InputParam.filter_columns[name][0]](value))
+                      for name, value in Tools.parse_filter(filter_list)]
+        return data_set.index.select(conditions)
+
+    @staticmethod
+    def do_sort(data, sort, reverse, limit=None):
+        """Сортирует вакансии по типизированным ключам. Ключи вычисляются один раз за сортировку в отдельный список,
+        а не хранятся в вакансиях. Если нужны только первые limit вакансий, они выбираются частичной сортировкой
+        через heapq вместо сортировки всего списка
 
             Args:
-                data (list): Список словарей с вакансиями
-                sort (list): Параметр фильтрации (список из столбца и параметра фильрации)
+                data (list): Список вакансий
+                sort (str): Параметр сортировки
                 reverse (str): Обратный ли порядок сортировки
+                limit (int or None): Сколько первых вакансий нужно, None - все
 
             Returns:
-                list: Отсортированный список словарей с вакансиями
-        """
-
-        is_reverse = False
-        if reverse == 'Да':
-            is_reverse = True
-
-        exp_sort = {'Нет опыта': 0, 'От 1 года до 3 лет': 1, 'От 3 до 6 лет': 2, 'Более 6 лет': 3}
-
-        def for_sort(row):
-            if sort == 'Оклад':
-                salary = row['salary_from'].split()
-                currency = re.search(r'\((.*?)\)', row['salary_from']).group(1)
-                salary_from, salary_to = Salary.get_salary_ru(salary[0], salary[2], currency)
-                return (salary_from + salary_to) / 2
-            if sort == 'Навыки':
-                skills = row['key_skills'].split('\n')
-                return len(skills)
-            if sort == 'Дата публикации вакансии':
-                return InputParam.get_date(row['published_at'])
-            if sort == 'Опыт работы':
-                return exp_sort[row['experience_id']]
-            return row[Tools.rus_names[sort]]
-
-        if sort != '':
-            return sorted(data, key=for_sort, reverse=is_reverse)
+                list: Отсортированный список вакансий (первые limit вакансий, если limit задан)
+        """
+        if limit is not None and not 0 <= limit < len(data):
+            limit = None
+        if sort == '':
+            return data[:limit]
+        get_key = Vacancy.sort_keys[sort]
+        keys = [get_key(vacancy) for vacancy in data]
+        if limit is not None:
+            if reverse == 'Да':
+                order = heapq.nlargest(limit, range(len(data)), key=keys.__getitem__)
+            else:
+                order = heapq.nsmallest(limit, range(len(data)), key=keys.__getitem__)
         else:
-            return data
+            order = sorted(range(len(data)), key=keys.__getitem__, reverse=reverse == 'Да')
+        return [data[number] for number in order]
 
     @staticmethod
-    def create_data(data, filter_list, sort, reverse):
-        """Сортирует талицу
+    def create_data(data, filter_list, sort, reverse, start=None, end=None, fields=None):
+        """Строит строки таблицы. Фильтруются и сортируются сами вакансии, а текст ячеек формируется только
+        для строк диапазона [start, end) и только для нужных столбцов
 
              Args:
-                 data (list): Список словарей с вакансиями
+                 data (DataSet): Данные с вакансиями
                  sort (list): Параметр фильтрации (список из столбца и параметра фильрации)
                  reverse (str): Обратный ли порядок сортировки
                  filter_list (str): Параметры фильтрации
+                 start (int or None): Начало диапазона вывода, None - с первой строки
+                 end (int or None): Конец диапазона вывода (не включается), None - до последней строки
+                 fields (list or None): Столбцы таблицы без '№', None - все столбцы
 
              Returns:
-                 list: Отсортированный список словарей с вакансиями
-        """
-        result = []
-        for i in range(len(data.vacancies_objects)):
-            dic = InputParam.formatter(data.vacancies_objects[i])
-            result.append(dic)
-
-        filtered_list = InputParam.do_filter(result, filter_list)
-        sorted_list = InputParam.do_sort(filtered_list, sort, reverse)
-
-        for i in range(len(sorted_list)):
-            salary = sorted_list[i]['salary_from'].split()
-            salary_from = '{0:,}'.format(int(salary[0])).replace(',', ' ')
-            salary_to = '{0:,}'.format(int(salary[2])).replace(',', ' ')
-            salary[0] = str(salary_from)
-            salary[2] = str(salary_to)
-            sorted_list[i]['salary_from'] = ' '.join(salary)
-            sorted_list[i]['published_at'] = InputParam.get_date(sorted_list[i])
-
-            new_list = list(sorted_list[i].values())
-            for j in range(len(new_list)):
-                if len(new_list[j]) > 100:
-                    new_list[j] = new_list[j][:100] + '...'
-            sorted_list[i] = new_list
-            sorted_list[i].insert(0, str(i + 1))
-        return sorted_list
+                 list: Строки таблицы, первая ячейка - номер вакансии после сортировки
+        """
+        limit = end if start is None or start >= 0 else None
+        sorted_list = InputParam.do_sort(InputParam.do_filter(data, filter_list), sort, reverse, limit)
+        return InputParam.get_page(sorted_list, start, end, fields)
+
+    @staticmethod
+    def get_page(sorted_list, start=None, end=None, fields=None):
+        """Строит строки таблицы для вакансий из диапазона [start, end) отсортированного списка
+
+            Args:
+                sorted_list (list): Отсортированные вакансии
+                start (int or None): Начало диапазона вывода, None - с первой строки
+                end (int or None): Конец диапазона вывода (не включается), None - до последней строки
+                fields (list or None): Столбцы таблицы без '№', None - все столбцы
+
+            Returns:
+                list: Строки таблицы, первая ячейка - номер вакансии после сортировки
+        """
+        numbers = range(1, len(sorted_list) + 1)[start:end]
+        return [[str(number)] + InputParam.formatter(row, fields)
+                for number, row in zip(numbers, sorted_list[start:end])]
+
+    @staticmethod
+    def get_range(indexes, count):
+        """Переводит введенный диапазон вывода в начало и конец среза строк таблицы
+
+            Args:
+                indexes (list): Введенные номера строк (ноль, одно или два числа в виде строк)
+                count (int): Количество вакансий
+
+            Returns:
+                Tuple (int, int): Начало и конец диапазона
+
+            >>> InputParam.get_range(['2', '5'], 100)
+            (1, 4)
+            >>> InputParam.get_range([], 100)
+            (0, 100)
+        """
+        indexes = list(indexes)
+        try:
+            indexes[0] = int(indexes[0]) - 1
+            indexes[1] = int(indexes[1]) - 1
+        except IndexError:
+            if len(indexes) == 0:
+                indexes.append(0)
+                indexes.append(count)
+            if len(indexes) == 1:
+                indexes.append(count)
+        return indexes[0], indexes[1]
+
+    @staticmethod
+    def get_fields(fields_list):
+        """Возвращает столбцы таблицы без '№' в порядке вывода
+
+            Args:
+                fields_list (list): Требуемые столбцы, [''] - все столбцы
+
+            Returns:
+                list: Столбцы таблицы
+        """
+        return [field for field in InputParam.cell_formatters if fields_list == [''] or field in fields_list]
+
+    @staticmethod
+    def print_table(rows, fields):
+        """Печатает строки таблицы
+
+            Args:
+                rows (list): Строки таблицы
+                fields (list): Столбцы таблицы без '№'
+        """
+        table = PrettyTable()
+        table.field_names = ['№'] + fields
+        table.align = 'l'
+        table.hrules = prettytable.ALL
+        table.max_width = 20
+        table.add_rows(rows)
+        print(table.get_string())
 
     @staticmethod
     def print_vacancies(data_set, filter_list, sort, reverse, indexes, fields_list):
@@ -448,31 +778,151 @@ class InputParam:
                 indexes (Sized): Индекс столбца по которому происходит сортировка
                 fields_list (list): Заполняющий лист
         """
-        table = PrettyTable()
-        rus_list = list(Tools.rus_names.keys())
-        table.field_names = ['№'] + rus_list[:7] + rus_list[10:]
-        table.align = 'l'
-        table.hrules = prettytable.ALL
-        table.max_width = 20
+        start, end = InputParam.get_range(indexes, len(data_set.vacancies_objects))
+        fields = InputParam.get_fields(fields_list)
+        InputParam.print_table(InputParam.create_data(data_set, filter_list, sort, reverse, start, end, fields), fields)
 
-        data = InputParam.create_data(data_set, filter_list, sort, reverse)
-        table.add_rows(data)
 
-        try:
-            indexes[0] = int(indexes[0]) - 1
-            indexes[1] = int(indexes[1]) - 1
-        except IndexError:
-            if len(indexes) == 0:
-                indexes.append(0)
-                indexes.append(len(data_set.vacancies_objects))
-            if len(indexes) == 1:
-                indexes.append(len(data_set.vacancies_objects))
+class TableSession:
+    """Класс интерактивного режима таблицы: файл читается и индексируется один раз, после чего пользователь вводит
+    команды, меняющие фильтр, сортировку, диапазон и столбцы, и сразу видит таблицу. Результаты фильтрации
+    и сортировки запоминаются, поэтому повторные запросы и смена диапазона или столбцов не пересчитывают их
 
-        if fields_list == ['']:
-            print(table.get_string(start=indexes[0], end=indexes[1]))
-        elif len(fields_list) == 1:
-            fields_list.insert(0, '№')
-            print(table.get_string(start=indexes[0], end=indexes[1], fields=fields_list))
-        else:
-            fields_list.insert(0, '№')
-            print(table.get_string(start=indexes[0], end=indexes[1], fields=fields_list))
+        Attributes:
+            data_set (DataSet): Данные с вакансиями
+            params (dict): Текущие параметры: фильтрация, сортировка, порядок, диапазон, столбцы
+            filtered (dict): Параметр фильтрации -> отфильтрованные вакансии
+            sorted (dict): (фильтрация, сортировка, порядок) -> отсортированные вакансии
+    """
+    cache_size = 16
+    commands = {'Фильтр': 'filter_param',
+                'Сортировка': 'sort_param',
+                'Обратный порядок': 'invert_param',
+                'Диапазон': 'range_param',
+                'Столбцы': 'columns_param'}
+    help = ('Команды: "Фильтр: <параметр>", "Сортировка: <столбец>", "Обратный порядок: Да / Нет", '
+            '"Диапазон: <от> <до>", "Столбцы: <столбец>, <столбец>", "Показать", "Выход" или пустая строка. '
+            'Пустое значение сбрасывает параметр, несколько условий фильтра разделяются "; "')
+
+    def __init__(self, file_name, cache=False):
+        """Инициализирует объект TableSession и читает файл со всеми колонками
+
+            Args:
+                file_name (str): Название файла
+                cache (bool): Брать ли очищенные колонки из кэша DatasetCache
+        """
+        self.data_set = DataSet(file_name, cache=cache)
+        self.params = {'filter_param': '', 'sort_param': '', 'invert_param': '', 'range_param': '',
+                       'columns_param': ''}
+        self.filtered = {}
+        self.sorted = {}
+
+    @staticmethod
+    def remember(cache, key, value):
+        """Запоминает результат, удаляя самый давний, если запомнено больше cache_size результатов
+
+            Args:
+                cache (dict): Запомненные результаты
+                key: Ключ результата
+                value: Результат
+
+            Returns:
+                Результат
+        """
+        if len(cache) >= TableSession.cache_size:
+            cache.pop(next(iter(cache)))
+        cache[key] = value
+        return value
+
+    def get_filtered(self, filter_param):
+        """Возвращает отфильтрованные вакансии, вычисляя их при первом запросе
+
+            Args:
+                filter_param (str): Параметр фильтрации
+
+            Returns:
+                list: Отфильтрованные вакансии
+        """
+        found = self.filtered.get(filter_param)
+        if found is None:
+            found = TableSession.remember(self.filtered, filter_param,
+                                          InputParam.select(self.data_set, filter_param))
+        return found
+
+    def get_sorted(self, filter_param, sort_param, invert_param):
+        """Возвращает отфильтрованные и отсортированные вакансии, вычисляя их при первом запросе
+
+            Args:
+                filter_param (str): Параметр фильтрации
+                sort_param (str): Параметр сортировки
+                invert_param (str): Обратный ли порядок сортировки
+
+            Returns:
+                list: Отсортированные вакансии
+        """
+        key = (filter_param, sort_param, invert_param)
+        found = self.sorted.get(key)
+        if found is None:
+            found = TableSession.remember(self.sorted, key, InputParam.do_sort(
+                self.get_filtered(filter_param), sort_param, invert_param))
+        return found
+
+    def get_rows(self):
+        """Строит строки таблицы по текущим параметрам
+
+            Returns:
+                Tuple (list, list): Строки таблицы и столбцы без '№'
+        """
+        params = self.params
+        sorted_list = self.get_sorted(params['filter_param'], params['sort_param'], params['invert_param'])
+        start, end = InputParam.get_range(params['range_param'].split(), len(self.data_set.vacancies_objects))
+        fields = InputParam.get_fields(params['columns_param'].split(', '))
+        return InputParam.get_page(sorted_list, start, end, fields), fields
+
+    def execute(self, command):
+        """Выполняет одну команду пользователя
+
+            Args:
+                command (str): Команда
+
+            Returns:
+                bool: Продолжать ли работу
+        """
+        command = command.strip()
+        if command in ('', 'Выход'):
+            return False
+        if command == 'Помощь':
+            print(TableSession.help)
+            return True
+        if command != 'Показать':
+            name, _, value = command.partition(':')
+            if name not in TableSession.commands:
+                print('Неизвестная команда. ' + TableSession.help)
+                return True
+            params = dict(self.params)
+            params[TableSession.commands[name]] = value.strip()
+            error = InputParam.check_params(params['filter_param'], params['sort_param'], params['invert_param'],
+                                            params['columns_param'])
+            if error is None and not all(index.isdigit() and int(index) > 0 for index in params['range_param'].split()):
+                error = 'Диапазон вывода задан некорректно'
+            if error is not None:
+                print(error)
+                return True
+            self.params = params
+        rows, fields = self.get_rows()
+        if not rows and not self.get_filtered(self.params['filter_param']):
+            print('Ничего не найдено')
+            return True
+        InputParam.print_table(rows, fields)
+        return True
+
+    def run(self):
+        """Читает и выполняет команды, пока пользователь не введет "Выход" или пустую строку"""
+        print(TableSession.help)
+        while True:
+            try:
+                command = input('> ')
+            except EOFError:
+                break
+            if not self.execute(command):
+                break
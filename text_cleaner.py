@@ -0,0 +1,101 @@
+import re
+
+
+class Cleaner:
+    """Класс очищает текст ячеек csv файла для report_out и table_out. Все регулярные выражения скомпилированы
+    заранее, а строки без тегов и лишних пробельных символов возвращаются без изменений
+    """
+    tag_pattern = re.compile(r'<[^>]+>')
+    dirty_pattern = re.compile(r'<|[^\S ]| {2}|^ | $')
+    rus_true_false = {'True': 'Да', 'False': 'Нет'}
+
+    @staticmethod
+    def clean_report(text):
+        """Очищает строку для формирования статистики: удаляет теги, заменяет переносы строк на '; '
+        и схлопывает пробелы
+
+            Args:
+                text (str): Строка, которую нужно очистить
+
+            Returns:
+                str: Очищенная строка
+
+            >>> Cleaner.clean_report('<div>Файл</div>')
+            'Файл'
+            >>> Cleaner.clean_report('AA          AAA')
+            'AA AAA'
+            >>> Cleaner.clean_report('you\\nme')
+            'you; me'
+        """
+        if not Cleaner.dirty_pattern.search(text):
+            return text
+        if '<' in text:
+            text = Cleaner.tag_pattern.sub('', text)
+        if '\n' in text:
+            text = '; '.join(text.split('\n'))
+        return ' '.join(text.split())
+
+    @staticmethod
+    def clean_text(text):
+        """Очищает строку без привязки к виду вывода: удаляет теги и схлопывает пробелы в однострочном тексте.
+        Так очищаются значения колоночных файлов частей: clean_report и clean_table дают по ее результату
+        то же, что и по исходной строке
+
+            Args:
+                text (str): Строка, которую нужно очистить
+
+            Returns:
+                str: Очищенная строка
+
+            >>> Cleaner.clean_text('<p>Python  <b>developer</b></p>')
+            'Python developer'
+            >>> Cleaner.clean_text('Git\\nLinux')
+            'Git\\nLinux'
+            >>> Cleaner.clean_text('True')
+            'True'
+        """
+        if Cleaner.dirty_pattern.search(text):
+            if '<' in text:
+                text = Cleaner.tag_pattern.sub('', text)
+            if '\n' not in text:
+                text = ' '.join(text.split())
+        return text
+
+    @staticmethod
+    def clean_table(text):
+        """Очищает строку для вывода таблицы: удаляет теги, схлопывает пробелы в однострочном тексте
+        и переводит True/False
+
+            Args:
+                text (str): Строка, которую нужно очистить
+
+            Returns:
+                str: Очищенная строка
+
+            >>> Cleaner.clean_table('<p>Python  <b>developer</b></p>')
+            'Python developer'
+            >>> Cleaner.clean_table('Git\\nLinux')
+            'Git\\nLinux'
+            >>> Cleaner.clean_table('True')
+            'Да'
+        """
+        text = Cleaner.clean_text(text)
+        return Cleaner.rus_true_false.get(text, text)
+
+    @staticmethod
+    def get_row_cleaner(heads, columns, clean):
+        """Создает функцию, которая очищает только нужные колонки строки csv файла
+
+            Args:
+                heads (list): Названия колонок файла
+                columns (iterable): Названия нужных колонок
+                clean (function): Функция очистки одной ячейки
+
+            Returns:
+                function: Принимает строку файла (list) и возвращает словарь {колонка: очищенное значение}
+
+            >>> Cleaner.get_row_cleaner(['name', 'description'], ['name'], Cleaner.clean_report)(['<b>A</b>', 'B'])
+            {'name': 'A'}
+        """
+        table = [(i, head) for i, head in enumerate(heads) if head in columns]
+        return lambda row: {head: clean(row[i]) for i, head in table}